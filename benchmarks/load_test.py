@@ -0,0 +1,362 @@
+"""Load test discovery, adding and Socket.IO fan-out against local TMDB and Radarr stand-ins.
+
+Usage: python benchmarks/load_test.py [--scenarios discovery add clients] [--library-size 5000] [--seeds 50] [--clients 20]
+
+A local HTTP server mimics TMDB's /3/search/movie, /3/movie/{id}/recommendations,
+/3/movie/{id}/similar and poster images, and Radarr's /api/v3/movie, with
+configurable latency, payload padding and injected HTTP 429 responses. Each
+scenario runs in a fresh child process so peak RSS is not polluted by earlier
+runs, and prints one JSON line that can be compared between commits:
+
+  discovery  SearchSession.start and load_more_movies over many seeds
+  add        DataHandler.queue_movies draining through the add workers
+  clients    many Socket.IO test clients searching and scrolling at once
+"""
+
+import argparse
+import collections
+import http.server
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+SRC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+LIBRARY_TMDB_ID_OFFSET = 1_000_000
+
+
+def build_tmdb_movie(tmdb_id, rng, padding):
+    return {
+        "id": tmdb_id,
+        "title": f"Candidate {tmdb_id}",
+        "original_title": f"Candidate {tmdb_id}",
+        "release_date": f"{1960 + tmdb_id % 60}-06-01",
+        "vote_average": round(rng.uniform(5.5, 9.0), 1),
+        "vote_count": rng.randint(50, 20000),
+        "popularity": round(rng.uniform(1.0, 200.0), 3),
+        "genre_ids": [28, 18],
+        "original_language": "en",
+        "poster_path": f"/{tmdb_id}.jpg",
+        "overview": padding,
+    }
+
+
+class FakeUpstream:
+    def __init__(self, args):
+        self.args = args
+        self.padding = "x" * args.payload_bytes
+        self.poster = b"\xff\xd8" + b"\x00" * args.poster_bytes
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+        self.added_count = 0
+        self.library_payload = json.dumps(
+            [{"id": index + 1, "title": f"Library Movie {index}", "year": 1960 + index % 60, "tmdbId": LIBRARY_TMDB_ID_OFFSET + index, "overview": self.padding} for index in range(args.library_size)]
+        ).encode()
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def reset(self):
+        with self.lock:
+            counts, self.counts = dict(self.counts), collections.Counter()
+        return counts
+
+    def handle(self, method, url):
+        parsed = urllib.parse.urlsplit(url)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        parts = parsed.path.strip("/").split("/")
+
+        if parts[:3] == ["api", "v3", "movie"]:
+            if method == "POST":
+                self.count("radarr_add")
+                with self.lock:
+                    self.added_count += 1
+                    radarr_id = self.args.library_size + self.added_count
+                return 201, "application/json", json.dumps({"id": radarr_id}).encode()
+            self.count("radarr_library")
+            return 200, "application/json", self.library_payload
+
+        if parts[:2] == ["t", "p"]:
+            self.count("tmdb_poster")
+            return 200, "image/jpeg", self.poster
+
+        if parts[:3] == ["3", "search", "movie"]:
+            self.count("tmdb_search")
+            title = query.get("query", "")
+            tmdb_id = int(title.rsplit(" ", 1)[-1]) if title.rsplit(" ", 1)[-1].isdigit() else 1
+            movie = build_tmdb_movie(tmdb_id, random.Random(tmdb_id), self.padding)
+            movie["title"] = movie["original_title"] = title
+            return 200, "application/json", json.dumps({"page": 1, "total_pages": 1, "results": [movie]}).encode()
+
+        if parts[:2] == ["3", "movie"] and len(parts) == 4 and parts[3] in ("recommendations", "similar"):
+            self.count(f"tmdb_{parts[3]}")
+            seed_id = int(parts[2])
+            page = int(query.get("page", 1))
+            rng = random.Random(seed_id * 1000 + page + (500 if parts[3] == "similar" else 0))
+            candidate_ids = rng.sample(range(1, self.args.candidate_pool + 1), 20)
+            results = [build_tmdb_movie(tmdb_id, random.Random(tmdb_id), self.padding) for tmdb_id in candidate_ids]
+            return 200, "application/json", json.dumps({"page": page, "total_pages": self.args.pages, "results": results}).encode()
+
+        self.count("not_found")
+        return 404, "application/json", b"{}"
+
+
+def start_fake_upstream(upstream):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def respond(self, method):
+            if method == "POST":
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if upstream.args.latency_ms:
+                time.sleep(upstream.args.latency_ms / 1000)
+            if upstream.args.error_rate and random.random() < upstream.args.error_rate:
+                upstream.count("injected_429")
+                status, content_type, body = 429, "application/json", b'{"status_message": "Too Many Requests"}'
+                extra_headers = {"Retry-After": "0"}
+            else:
+                status, content_type, body = upstream.handle(method, self.path)
+                extra_headers = {}
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for header, value in extra_headers.items():
+                self.send_header(header, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.respond("GET")
+
+        def do_POST(self):
+            self.respond("POST")
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def get_peak_rss_mb():
+    with open("/proc/self/status") as status_file:
+        for line in status_file:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_discovery(RadaRec, args):
+    data_handler = RadaRec.data_handler
+    session = RadaRec.SearchSession(data_handler, None)
+    data_handler.sessions[None] = session
+    events = []
+    session.emit = lambda event, data=None: events.append((time.perf_counter(), event, data))
+
+    start_time = time.perf_counter()
+    session.start([str(item.tmdb_id) for item in data_handler.radarr_items[: args.seeds]])
+    deadline = start_time + args.timeout
+    card_count = 0
+    first_card_time = None
+    processed_events = 0
+    exhausted = False
+    while card_count < args.cards and not exhausted and time.perf_counter() < deadline:
+        session.load_more_movies()
+        time.sleep(0.05)
+        for event_time, event, data in events[processed_events:]:
+            if event == "more_movies_loaded":
+                card_count += len(data)
+                first_card_time = first_card_time or event_time
+            elif event == "new_toast_msg" and data["title"] == "Search Exhausted":
+                exhausted = True
+        processed_events = len(events)
+    elapsed = time.perf_counter() - start_time
+    session.stop()
+    return {
+        "seeds": args.seeds,
+        "cards": card_count,
+        "exhausted": exhausted,
+        "time_to_first_card_seconds": round(first_card_time - start_time, 3) if first_card_time else None,
+        "cards_per_second": round(card_count / elapsed, 1),
+    }
+
+
+def run_add(RadaRec, args):
+    data_handler = RadaRec.data_handler
+    movies = [[urllib.parse.quote(f"Candidate {tmdb_id}"), str(1960 + tmdb_id % 60)] for tmdb_id in range(1, args.adds + 1)]
+    start_time = time.perf_counter()
+    data_handler.queue_movies(movies, None)
+    data_handler.add_queue.join()
+    data_handler.library_additions.flush()
+    elapsed = time.perf_counter() - start_time
+    return {
+        "adds": len(movies),
+        "library_size_after": len(data_handler.radarr_items),
+        "add_seconds": round(elapsed, 3),
+        "adds_per_second": round(len(movies) / elapsed, 1),
+    }
+
+
+def run_clients(RadaRec, args):
+    library_tmdb_ids = [str(item.tmdb_id) for item in RadaRec.data_handler.radarr_items]
+    results = []
+    results_lock = threading.Lock()
+
+    def simulate_client(index):
+        client = RadaRec.socketio.test_client(RadaRec.app)
+        seeds = random.Random(index).sample(library_tmdb_ids, min(args.seeds, len(library_tmdb_ids)))
+        start_time = time.perf_counter()
+        client.emit("start_req", seeds)
+        deadline = start_time + args.timeout
+        card_count = 0
+        first_card_time = None
+        exhausted = False
+        while card_count < args.cards and not exhausted and time.perf_counter() < deadline:
+            client.emit("load_more_movies")
+            time.sleep(0.05)
+            for message in client.get_received():
+                if message["name"] == "more_movies_loaded":
+                    card_count += len(message["args"][0])
+                    first_card_time = first_card_time or time.perf_counter()
+                elif message["name"] == "new_toast_msg" and message["args"][0]["title"] == "Search Exhausted":
+                    exhausted = True
+        client.emit("stop_req")
+        client.disconnect()
+        with results_lock:
+            results.append((first_card_time - start_time if first_card_time else None, card_count, time.perf_counter() - start_time))
+
+    start_time = time.perf_counter()
+    threads = [threading.Thread(target=simulate_client, args=(index,), name=f"Load_Test_Client_{index}") for index in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+
+    first_card_times = [first_card_time for first_card_time, _, _ in results if first_card_time is not None]
+    total_cards = sum(card_count for _, card_count, _ in results)
+    return {
+        "clients": args.clients,
+        "seeds_per_client": args.seeds,
+        "clients_without_cards": args.clients - len(first_card_times),
+        "cards": total_cards,
+        "time_to_first_card_p50_seconds": percentile(first_card_times, 0.5),
+        "time_to_first_card_p95_seconds": percentile(first_card_times, 0.95),
+        "cards_per_second": round(total_cards / elapsed, 1),
+    }
+
+
+def run_child(args):
+    os.environ.update(
+        {
+            "radarr_address": f"http://127.0.0.1:{args.child_port}",
+            "radarr_api_key": "benchmark",
+            "tmdb_api_key": "benchmark",
+            "tmdb_api_url": f"http://127.0.0.1:{args.child_port}/3",
+            "tmdb_image_url": f"http://127.0.0.1:{args.child_port}/t/p",
+            "tmdb_rate_limit": str(args.tmdb_rate_limit),
+        }
+    )
+    sys.path.insert(0, SRC_FOLDER)
+    import RadaRec
+
+    RadaRec.logging.getLogger().setLevel(RadaRec.logging.WARNING)
+    baseline_rss = get_peak_rss_mb()
+    start_time = time.perf_counter()
+    RadaRec.data_handler.request_movies_from_radarr()
+    library_seconds = time.perf_counter() - start_time
+
+    scenario = {"discovery": run_discovery, "add": run_add, "clients": run_clients}[args.child_scenario]
+    result = scenario(RadaRec, args)
+    peak_rss = get_peak_rss_mb()
+    result.update(
+        {
+            "library_size": len(RadaRec.data_handler.radarr_items),
+            "library_refresh_seconds": round(library_seconds, 3),
+            "peak_rss_mb": round(peak_rss, 1),
+            "rss_growth_mb": round(peak_rss - baseline_rss, 1),
+        }
+    )
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=["discovery", "add", "clients"], default=["discovery", "add", "clients"])
+    parser.add_argument("--library-size", type=int, default=5000)
+    parser.add_argument("--seeds", type=int, default=50, help="seed movies per search")
+    parser.add_argument("--cards", type=int, default=200, help="cards to scroll through per search")
+    parser.add_argument("--adds", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3, help="recommendation pages per seed")
+    parser.add_argument("--candidate-pool", type=int, default=20000, help="distinct TMDB IDs recommendations are drawn from")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--payload-bytes", type=int, default=300, help="overview padding per movie")
+    parser.add_argument("--poster-bytes", type=int, default=30000)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream requests answered with HTTP 429")
+    parser.add_argument("--tmdb-rate-limit", type=float, default=1000.0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds allowed per search")
+    parser.add_argument("--child-port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_port:
+        run_child(args)
+        return
+
+    commit = get_commit()
+    upstream = FakeUpstream(args)
+    server = start_fake_upstream(upstream)
+    child_args = sys.argv[1:]
+    for scenario in args.scenarios:
+        upstream.reset()
+        with tempfile.TemporaryDirectory() as work_folder:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), *child_args, "--child-port", str(server.server_address[1]), "--child-scenario", scenario],
+                cwd=work_folder,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            json.dumps(
+                {
+                    "benchmark": "load_test",
+                    "scenario": scenario,
+                    "commit": commit,
+                    "latency_ms": args.latency_ms,
+                    "error_rate": args.error_rate,
+                    **result,
+                    "upstream_requests": upstream.reset(),
+                }
+            )
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Measure Radarr library refresh time and peak RSS for synthetic libraries.
+
+Usage: python benchmarks/radarr_ingest.py [--sizes 1000 10000 50000]
+
+A local HTTP server stands in for Radarr's /api/v3/movie endpoint and each
+library size is loaded by DataHandler.request_movies_from_radarr in a fresh
+child process, so peak RSS is not polluted by earlier runs.
+"""
+
+import argparse
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SRC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def build_radarr_movie(index):
+    return {
+        "id": index + 1,
+        "title": f"Synthetic Movie {index} ({1950 + index % 70})",
+        "originalTitle": f"Synthetic Movie {index}",
+        "alternateTitles": [{"sourceType": "tmdb", "movieMetadataId": index, "title": f"Alternate Title {index} {n}"} for n in range(5)],
+        "sortTitle": f"synthetic movie {index}",
+        "sizeOnDisk": 4_500_000_000 + index,
+        "status": "released",
+        "overview": "A synthetic overview used to pad the payload to a realistic size. " * 8,
+        "images": [{"coverType": cover, "url": f"/MediaCover/{index}/{cover}.jpg", "remoteUrl": f"https://image.tmdb.org/t/p/original/{index}_{cover}.jpg"} for cover in ("poster", "fanart")],
+        "website": "https://example.com",
+        "year": 1950 + index % 70,
+        "youTubeTrailerId": "abcdefghijk",
+        "studio": "Synthetic Studios",
+        "path": f"/data/media/movies/Synthetic Movie {index}",
+        "qualityProfileId": 1,
+        "hasFile": True,
+        "monitored": True,
+        "runtime": 120,
+        "cleanTitle": f"syntheticmovie{index}",
+        "imdbId": f"tt{index:07d}",
+        "tmdbId": 100000 + index,
+        "titleSlug": f"synthetic-movie-{index}",
+        "genres": ["Action", "Drama", "Thriller"],
+        "tags": [],
+        "added": "2020-01-01T00:00:00Z",
+        "ratings": {source: {"votes": 1000 + index, "value": 7.1, "type": "user"} for source in ("imdb", "tmdb", "metacritic", "rottenTomatoes")},
+        "movieFile": {
+            "movieId": index + 1,
+            "relativePath": f"Synthetic Movie {index}.mkv",
+            "size": 4_500_000_000 + index,
+            "mediaInfo": {"audioCodec": "DTS", "audioChannels": 5.1, "videoCodec": "x264", "resolution": "1920x1080", "runTime": "2:00:00", "subtitles": "English / French"},
+            "quality": {"quality": {"id": 7, "name": "Bluray-1080p", "source": "bluray", "resolution": 1080}},
+            "languages": [{"id": 1, "name": "English"}],
+        },
+        "popularity": 12.5,
+    }
+
+
+def start_fake_radarr(payload):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def get_peak_rss_mb():
+    # ru_maxrss survives fork+exec on Linux, so read the high-water mark of this process's own address space.
+    with open("/proc/self/status") as status_file:
+        for line in status_file:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_child(port):
+    os.environ["radarr_address"] = f"http://127.0.0.1:{port}"
+    sys.path.insert(0, SRC_FOLDER)
+    import RadaRec
+
+    baseline_rss = get_peak_rss_mb()
+    start_time = time.perf_counter()
+    RadaRec.data_handler.request_movies_from_radarr()
+    elapsed = time.perf_counter() - start_time
+    peak_rss = get_peak_rss_mb()
+    result = {
+        "movies": len(RadaRec.data_handler.radarr_items),
+        "refresh_seconds": round(elapsed, 3),
+        "peak_rss_mb": round(peak_rss, 1),
+        "refresh_rss_growth_mb": round(peak_rss - baseline_rss, 1),
+    }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--child-port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_port:
+        run_child(args.child_port)
+        return
+
+    for size in args.sizes:
+        payload = json.dumps([build_radarr_movie(index) for index in range(size)]).encode()
+        server = start_fake_radarr(payload)
+        with tempfile.TemporaryDirectory() as work_folder:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child-port", str(server.server_address[1])],
+                cwd=work_folder,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+        server.shutdown()
+        result = json.loads(output.strip().splitlines()[-1])
+        result["payload_mb"] = round(len(payload) / 1_000_000, 1)
+        print(json.dumps({"benchmark": "radarr_ingest", "size": size, **result}))
+
+
+if __name__ == "__main__":
+    main()
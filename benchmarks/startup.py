@@ -0,0 +1,128 @@
+"""Measure how long a cold start takes before RadaRec can serve the UI.
+
+Usage: python benchmarks/startup.py [--library-size 20000] [--posters 2000] [--runs 5] [--budget 1.0]
+
+A config folder is seeded once with a Radarr library snapshot, cached posters
+and TMDB responses, then RadaRec is imported in a fresh child process for every
+run. Each run prints one JSON line that can be compared between commits:
+
+  import_seconds      importing RadaRec, which builds the DataHandler
+  ready_seconds       process launch until GET / and a Socket.IO connect succeed
+  library_seconds     process launch until the library snapshot is loaded
+  lazy_modules        heavy modules that were imported before the UI was ready
+  config_rewritten    whether settings_config.json was written on startup
+
+The script exits with status 1 when the median ready_seconds exceeds --budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+LAZY_MODULES = ["thefuzz", "unidecode", "iso639"]
+
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def seed_config(args):
+    sys.path.insert(0, SRC_FOLDER)
+    import RadaRec
+
+    data_handler = RadaRec.data_handler
+    library = [RadaRec.RadarrMovie(name=f"Library Movie {index}", year=1960 + index % 60, tmdb_id=1_000_000 + index, radarr_id=index + 1) for index in range(args.library_size)]
+    data_handler.shared_state.write_library(library, replace_all=True)
+    poster = b"\xff\xd8" + b"\x00" * args.poster_bytes
+    for index in range(args.posters):
+        data_handler.poster_cache.set(1_000_000 + index, poster)
+    for index in range(args.tmdb_responses):
+        data_handler.tmdb_cache.set("recommendations", {"url": f"https://api.themoviedb.org/3/movie/{index}/recommendations", "page": 1}, {"page": 1, "total_pages": 1, "results": []})
+
+
+def run_child(launched_at):
+    settings_file = os.path.join("config", "settings_config.json")
+    settings_mtime = os.stat(settings_file).st_mtime_ns
+    sys.path.insert(0, SRC_FOLDER)
+
+    start_time = time.perf_counter()
+    import RadaRec
+
+    import_seconds = time.perf_counter() - start_time
+    response = RadaRec.app.test_client().get("/")
+    socketio_client = RadaRec.socketio.test_client(RadaRec.app)
+    if response.status_code != 200 or not socketio_client.is_connected():
+        raise RuntimeError("UI did not come up")
+    ready_seconds = time.time() - launched_at
+    lazy_modules = [module for module in LAZY_MODULES if module in sys.modules]
+
+    data_handler = RadaRec.data_handler
+    deadline = time.monotonic() + 60
+    while data_handler.library_version == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    library_seconds = time.time() - launched_at
+    socketio_client.disconnect()
+
+    result = {
+        "import_seconds": round(import_seconds, 3),
+        "ready_seconds": round(ready_seconds, 3),
+        "library_seconds": round(library_seconds, 3),
+        "library_movies": len(data_handler.radarr_items),
+        "lazy_modules": lazy_modules,
+        "config_rewritten": os.stat(settings_file).st_mtime_ns != settings_mtime,
+    }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--library-size", type=int, default=20000)
+    parser.add_argument("--posters", type=int, default=2000)
+    parser.add_argument("--poster-bytes", type=int, default=30000)
+    parser.add_argument("--tmdb-responses", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="maximum median seconds until the UI is ready")
+    parser.add_argument("--child-seed", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child-launched-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_seed:
+        seed_config(args)
+        return
+    if args.child_launched_at:
+        run_child(args.child_launched_at)
+        return
+
+    commit = get_commit()
+    ready_times = []
+    with tempfile.TemporaryDirectory() as work_folder:
+        subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--child-seed"], cwd=work_folder, capture_output=True, check=True)
+        for run in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child-launched-at", repr(time.time())],
+                cwd=work_folder,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            ready_times.append(result["ready_seconds"])
+            print(json.dumps({"benchmark": "startup", "run": run, "commit": commit, "library_size": args.library_size, "posters": args.posters, **result}))
+
+    median_ready = statistics.median(ready_times)
+    print(json.dumps({"benchmark": "startup", "commit": commit, "median_ready_seconds": round(median_ready, 3), "budget_seconds": args.budget}))
+    if median_ready > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
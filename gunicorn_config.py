@@ -1,5 +1,13 @@
+import os
+import time
+
 bind = "0.0.0.0:5000"
-workers = 1
+workers = int(os.environ.get("GUNICORN_WORKERS", "1"))
 threads = 4
 timeout = 120
 worker_class = "geventwebsocket.gunicorn.workers.GeventWebSocketWorker"
+
+
+def on_starting(server):
+    # Inherited by the workers; leases held by workers of a previous run are expired when a new boot ID is seen.
+    os.environ["RADAREC_BOOT_ID"] = f"{os.getpid()}-{int(time.time())}"
@@ -2,16 +2,1072 @@ import json
 import time
 import logging
 import os
+import sys
+import signal
 import random
+import sqlite3
 import threading
+import collections
+import concurrent.futures
 import urllib.parse
-from flask import Flask, render_template
+import email.utils
+import codecs
+import bisect
+import queue
+import heapq
+import itertools
+import math
+from flask import Flask, render_template, request, abort, send_file
 from flask_socketio import SocketIO
 import requests
-from thefuzz import fuzz
-from unidecode import unidecode
 import re
-from iso639 import Lang
+
+
+YEAR_SUFFIX_PATTERN = re.compile(r" \(\d{4}\)")
+TMDB_PAGE_SIZE = 20
+
+
+def clean_title(title):
+    from unidecode import unidecode
+
+    return YEAR_SUFFIX_PATTERN.sub("", unidecode(title, replace_str=" "))
+
+
+def normalize_title(title):
+    return clean_title(title).lower()
+
+
+def iter_json_array(chunks):
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    expecting = "["
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position >= len(buffer):
+                break
+            character = buffer[position]
+            if expecting == "[":
+                if character != "[":
+                    raise ValueError("Expected a JSON array")
+                expecting = "first_item"
+                position += 1
+            elif expecting == "end":
+                raise ValueError("Unexpected data after the JSON array")
+            elif character == "]" and expecting in ("first_item", "separator"):
+                expecting = "end"
+                position += 1
+            elif expecting == "separator":
+                if character != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, found {character!r}")
+                expecting = "item"
+                position += 1
+            else:
+                try:
+                    item, position_after = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    break
+                # A number or literal that ends the buffer may continue in the next chunk.
+                if position_after == len(buffer) and character not in "{[\"":
+                    break
+                yield item
+                expecting = "separator"
+                position = position_after
+        buffer = buffer[position:]
+    text_decoder.decode(b"", final=True)
+    if expecting == "[":
+        raise ValueError("Expected a JSON array")
+    if expecting != "end":
+        raise ValueError("JSON array ended before its closing bracket")
+
+
+class RadarrMovie:
+    __slots__ = ("name", "year", "tmdb_id", "radarr_id")
+
+    def __init__(self, name, year, tmdb_id, radarr_id):
+        self.name = name
+        self.year = year
+        self.tmdb_id = tmdb_id
+        self.radarr_id = radarr_id
+
+    def to_dict(self, checked=False):
+        return {"name": self.name, "year": self.year, "tmdb_id": self.tmdb_id, "radarr_id": self.radarr_id, "checked": checked}
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class Metrics:
+    def __init__(self, buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.metadata = {}
+        self.counters = {}
+        self.histograms = {}
+        self.callbacks = []
+
+    def describe(self, name, metric_type, help_text):
+        self.metadata[name] = (metric_type, help_text)
+
+    def register_callback(self, name, metric_type, help_text, callback):
+        self.describe(name, metric_type, help_text)
+        self.callbacks.append((name, callback))
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            position = bisect.bisect_left(self.buckets, value)
+            if position < len(self.buckets):
+                histogram[0][position] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def format_labels(self, labels):
+        if not labels:
+            return ""
+        escaped_labels = []
+        for label, value in labels:
+            escaped_value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            escaped_labels.append(f'{label}="{escaped_value}"')
+        return "{" + ",".join(escaped_labels) + "}"
+
+    def collect(self, **extra_labels):
+        extra_labels = tuple(sorted(extra_labels.items()))
+        samples = collections.defaultdict(list)
+        with self.lock:
+            for (name, labels), value in self.counters.items():
+                samples[name].append(f"{name}{self.format_labels(labels + extra_labels)} {value}")
+            for (name, labels), (bucket_counts, total, count) in self.histograms.items():
+                labels += extra_labels
+                cumulative_count = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative_count += bucket_count
+                    samples[name].append(f"{name}_bucket{self.format_labels(labels + (('le', bound),))} {cumulative_count}")
+                samples[name].append(f"{name}_bucket{self.format_labels(labels + (('le', '+Inf'),))} {count}")
+                samples[name].append(f"{name}_sum{self.format_labels(labels)} {total}")
+                samples[name].append(f"{name}_count{self.format_labels(labels)} {count}")
+
+        for name, callback in self.callbacks:
+            try:
+                values = callback()
+            except Exception:
+                continue
+            if not isinstance(values, list):
+                values = [({}, values)]
+            for labels, value in values:
+                samples[name].append(f"{name}{self.format_labels(tuple(sorted(labels.items())) + extra_labels)} {value}")
+        return samples
+
+    def render(self, samples=None):
+        if samples is None:
+            samples = self.collect()
+        lines = []
+        for name in sorted(samples):
+            metric_type, help_text = self.metadata.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples[name])
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.running = False
+        self.use_signals = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self, interval):
+        with self.lock:
+            if self.running:
+                return False
+            self.running = True
+            self.stacks.clear()
+            self.samples = 0
+            # Under the gevent worker every "thread" is a greenlet on the main OS thread, so sample whatever is running when SIGPROF fires.
+            gevent_monkey = sys.modules.get("gevent.monkey")
+            self.use_signals = gevent_monkey is not None and gevent_monkey.is_module_patched("threading")
+            if self.use_signals:
+                signal.signal(signal.SIGPROF, self.handle_signal)
+                signal.setitimer(signal.ITIMER_PROF, interval, interval)
+            else:
+                self.stop_event.clear()
+                self.thread = threading.Thread(target=self.sample_threads, args=(interval,), name="Sampling_Profiler")
+                self.thread.daemon = True
+                self.thread.start()
+        return True
+
+    def stop(self):
+        with self.lock:
+            if not self.running:
+                return None
+            self.running = False
+            if self.use_signals:
+                signal.setitimer(signal.ITIMER_PROF, 0, 0)
+                signal.signal(signal.SIGPROF, signal.SIG_DFL)
+            else:
+                self.stop_event.set()
+                self.thread.join()
+                self.thread = None
+            return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def record_stack(self, frame, thread_name):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        self.stacks[";".join(reversed(stack))] += 1
+
+    def handle_signal(self, signum, frame):
+        self.record_stack(frame, "main")
+        self.samples += 1
+
+    def sample_threads(self, interval):
+        profiler_thread_id = threading.get_ident()
+        while not self.stop_event.wait(interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != profiler_thread_id:
+                    self.record_stack(frame, thread_names.get(thread_id, str(thread_id)))
+            self.samples += 1
+
+
+class UpstreamClient:
+    def __init__(self, name, pool_size, timeout, max_retries, rate_limiter=None):
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.thread_state = threading.local()
+        self.logger = logging.getLogger()
+
+    def get_thread_request_count(self):
+        return getattr(self.thread_state, "request_count", 0)
+
+    def get_retry_delay(self, response, attempt):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            if retry_after.isdigit():
+                return min(float(retry_after), 60.0)
+            try:
+                retry_date = email.utils.parsedate_to_datetime(retry_after)
+                return min(max(retry_date.timestamp() - time.time(), 0.0), 60.0)
+            except (TypeError, ValueError):
+                pass
+        return min(0.5 * (2**attempt) + random.uniform(0, 0.25), 30.0)
+
+    def request(self, method, url, call=None, retry_statuses=(429, 500, 502, 503, 504), retry_connection_errors=True, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        call = call or self.name.lower()
+        start_time = time.perf_counter()
+        status = "error"
+        attempt = 0
+        try:
+            while True:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                self.thread_state.request_count = self.get_thread_request_count() + 1
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if not retry_connection_errors or attempt >= self.max_retries:
+                        raise
+                    response = None
+                else:
+                    if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                        status = response.status_code
+                        return response
+
+                delay = self.get_retry_delay(response, attempt)
+                reason = response.status_code if response is not None else "connection error"
+                if response is not None:
+                    # Hand the pooled connection back before waiting; streamed responses otherwise hold it until collected.
+                    response.close()
+                metrics.inc("radarec_upstream_retries_total", call=call, reason=reason)
+                self.logger.warning(f"{self.name} request failed ({reason}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+
+        finally:
+            # Streamed responses are timed by the caller once the body has been read.
+            if not kwargs.get("stream"):
+                metrics.observe("radarec_upstream_request_seconds", time.perf_counter() - start_time, call=call)
+            metrics.inc("radarec_upstream_requests_total", call=call, status=status)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, retry_statuses=(429,), retry_connection_errors=False, **kwargs)
+
+
+class TMDBCache:
+    def __init__(self, db_path, memory_size, max_disk_entries, ttls):
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+        self.ttls = ttls
+        self.memory = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.writes_since_prune = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "memory_evictions": 0, "disk_evictions": 0, "expired": 0}
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA mmap_size=268435456")
+        self.db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, stored_at REAL NOT NULL, last_used REAL NOT NULL, data TEXT NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.db.commit()
+
+    def make_key(self, endpoint, params):
+        return f"{endpoint}?{urllib.parse.urlencode(sorted(params.items()))}"
+
+    def get(self, endpoint, params):
+        key = self.make_key(endpoint, params)
+        ttl = self.ttls.get(endpoint, 0)
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                stored_at, data = entry
+                if now - stored_at < ttl:
+                    self.memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return data
+                del self.memory[key]
+                self.stats["expired"] += 1
+
+            row = self.db.execute("SELECT stored_at, data FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                stored_at, raw_data = row
+                if now - stored_at < ttl:
+                    self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                    self.db.commit()
+                    data = json.loads(raw_data)
+                    self.store_in_memory(key, stored_at, data)
+                    self.stats["disk_hits"] += 1
+                    return data
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.db.commit()
+                self.stats["expired"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, endpoint, params, data):
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self.lock:
+            self.store_in_memory(key, now, data)
+            self.db.execute("INSERT OR REPLACE INTO responses (key, endpoint, stored_at, last_used, data) VALUES (?, ?, ?, ?, ?)", (key, endpoint, now, now, json.dumps(data)))
+            self.db.commit()
+            self.writes_since_prune += 1
+            if self.writes_since_prune >= 100:
+                self.writes_since_prune = 0
+                self.prune_disk(now)
+
+    def store_in_memory(self, key, stored_at, data):
+        self.memory[key] = (stored_at, data)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+            self.stats["memory_evictions"] += 1
+
+    def prune_disk(self, now):
+        for endpoint, ttl in self.ttls.items():
+            cursor = self.db.execute("DELETE FROM responses WHERE endpoint = ? AND stored_at < ?", (endpoint, now - ttl))
+            self.stats["expired"] += cursor.rowcount
+        count = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_disk_entries:
+            cursor = self.db.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)", (count - self.max_disk_entries,))
+            self.stats["disk_evictions"] += cursor.rowcount
+        self.db.commit()
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, memory_entries=len(self.memory))
+
+
+class PosterCache:
+    def __init__(self, cache_folder, max_bytes):
+        self.cache_folder = os.path.abspath(cache_folder)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+        self.total_bytes = 0
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def load(self):
+        cached_files = []
+        for file_name in os.listdir(self.cache_folder):
+            path = os.path.join(self.cache_folder, file_name)
+            try:
+                # Another worker may still be writing a recent temporary file.
+                if file_name.endswith(".tmp") and os.stat(path).st_mtime < time.time() - 60:
+                    os.remove(path)
+                elif file_name.endswith(".jpg"):
+                    stat = os.stat(path)
+                    cached_files.append((stat.st_atime, file_name, stat.st_size))
+            except OSError:
+                pass
+        with self.lock:
+            # Workers share the folder, so the index is rebuilt from disk, where access times record every worker's hits.
+            entries = collections.OrderedDict((file_name, size) for _, file_name, size in sorted(cached_files))
+            for file_name, size in self.entries.items():
+                # Posters written while the folder was scanned are missing from the listing but are the most recently used.
+                if file_name not in entries and os.path.exists(os.path.join(self.cache_folder, file_name)):
+                    entries[file_name] = size
+            self.entries = entries
+            self.total_bytes = sum(entries.values())
+            evicted_files = self.evict()
+        self.remove_files(evicted_files)
+
+    def evict(self):
+        evicted_files = []
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            evicted_file, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            evicted_files.append(evicted_file)
+        return evicted_files
+
+    def remove_files(self, file_names):
+        for file_name in file_names:
+            try:
+                os.remove(os.path.join(self.cache_folder, file_name))
+            except OSError:
+                pass
+
+    def get(self, tmdb_id):
+        file_name = f"{tmdb_id}.jpg"
+        path = os.path.join(self.cache_folder, file_name)
+        with self.lock:
+            if file_name in self.entries:
+                self.entries.move_to_end(file_name)
+            elif os.path.exists(path):
+                self.entries[file_name] = os.path.getsize(path)
+                self.total_bytes += self.entries[file_name]
+            else:
+                return None
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            with self.lock:
+                self.total_bytes -= self.entries.pop(file_name, 0)
+            return None
+        return path
+
+    def set(self, tmdb_id, content):
+        file_name = f"{tmdb_id}.jpg"
+        path = os.path.join(self.cache_folder, file_name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as poster_file:
+            poster_file.write(content)
+        os.replace(temp_path, path)
+
+        with self.lock:
+            self.total_bytes -= self.entries.pop(file_name, 0)
+            self.entries[file_name] = len(content)
+            self.total_bytes += len(content)
+            evicted_files = self.evict()
+        self.remove_files(evicted_files)
+        return path
+
+
+class RecommendationRanker:
+    def __init__(self, minimum_votes, prior_rating=5.0):
+        self.minimum_votes = max(minimum_votes or 0, 1)
+        self.prior_rating = prior_rating
+        self.pending = {}
+        self.heap = []
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def clear(self):
+        self.pending.clear()
+        self.heap.clear()
+
+    def score(self, movie, weights):
+        votes = movie["Votes"] or 0
+        rating = (votes * (movie["Rating"] or 0) + self.minimum_votes * self.prior_rating) / (votes + self.minimum_votes)
+        popularity = math.log1p(float(movie["Popularity"] or 0))
+        return round(sum(weights.values()) * rating * (1 + 0.1 * popularity), 3)
+
+    def add_hit(self, movie, seed_name, rank):
+        weights = movie.setdefault("Seed_Weights", {})
+        weights[seed_name] = max(weights.get(seed_name, 0.0), 1 / math.log2(rank + 2))
+        movie["Base_Movie"] = ", ".join(weights)
+        movie["Score"] = self.score(movie, weights)
+        if movie["TMDB_ID"] in self.pending:
+            heapq.heappush(self.heap, (-movie["Score"], next(self.counter), movie["TMDB_ID"]))
+            if len(self.heap) > 4 * len(self.pending) + 64:
+                self.heap = [(-pending_movie["Score"], next(self.counter), tmdb_id) for tmdb_id, pending_movie in self.pending.items()]
+                heapq.heapify(self.heap)
+        return movie["Score"]
+
+    def push(self, movie):
+        self.pending[movie["TMDB_ID"]] = movie
+        heapq.heappush(self.heap, (-movie["Score"], next(self.counter), movie["TMDB_ID"]))
+
+    def pop(self):
+        while self.heap:
+            negative_score, _, tmdb_id = heapq.heappop(self.heap)
+            movie = self.pending.get(tmdb_id)
+            if movie is not None and movie["Score"] == -negative_score:
+                del self.pending[tmdb_id]
+                return movie
+        return None
+
+
+class RecommendationStore:
+    def __init__(self, db_path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS candidates (tmdb_id INTEGER PRIMARY KEY, data TEXT NOT NULL, source_seeds TEXT NOT NULL, first_seen REAL NOT NULL, last_seen REAL NOT NULL, outcome TEXT, score REAL NOT NULL DEFAULT 0)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS candidates_outcome_score ON candidates (outcome, score)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seeds (tmdb_id INTEGER PRIMARY KEY, last_searched REAL NOT NULL, next_pages TEXT NOT NULL)")
+        self.db.commit()
+
+    def get_candidates(self, tmdb_ids):
+        if not tmdb_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in tmdb_ids)
+        with self.lock:
+            rows = self.db.execute(f"SELECT tmdb_id, outcome, data FROM candidates WHERE tmdb_id IN ({placeholders})", list(tmdb_ids)).fetchall()
+        return {tmdb_id: (outcome, json.loads(data)) for tmdb_id, outcome, data in rows}
+
+    def count_pending(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM candidates WHERE outcome IS NULL").fetchone()[0]
+
+    def select_seeds(self, tmdb_ids, limit, retire_for):
+        with self.lock:
+            seed_states = {tmdb_id: (last_searched, json.loads(next_pages)) for tmdb_id, last_searched, next_pages in self.db.execute("SELECT tmdb_id, last_searched, next_pages FROM seeds")}
+        # An empty next_pages marks a seed whose recommendations have all been harvested. It is retired for
+        # retire_for seconds and then searched again from page 1, since TMDB's recommendations change over time.
+        retired_before = time.time() - retire_for
+        active_seeds = [tmdb_id for tmdb_id in tmdb_ids if seed_states.get(tmdb_id, (0.0, None))[1] != {} or seed_states[tmdb_id][0] < retired_before]
+        least_recent = heapq.nsmallest(limit, active_seeds, key=lambda tmdb_id: seed_states.get(tmdb_id, (0.0, None))[0])
+        return [(tmdb_id, seed_states.get(tmdb_id, (0.0, None))[1] or None) for tmdb_id in least_recent]
+
+    def mark_seed_searched(self, tmdb_id, next_pages):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO seeds (tmdb_id, last_searched, next_pages) VALUES (?, ?, ?)", (tmdb_id, time.time(), json.dumps(next_pages)))
+            self.db.commit()
+
+    def record_candidates(self, movies, seed_name):
+        if not movies:
+            return
+        now = time.time()
+        tmdb_ids = [movie["TMDB_ID"] for movie in movies]
+        placeholders = ", ".join("?" for _ in tmdb_ids)
+        with self.lock:
+            existing_seeds = dict(self.db.execute(f"SELECT tmdb_id, source_seeds FROM candidates WHERE tmdb_id IN ({placeholders})", tmdb_ids).fetchall())
+            rows = []
+            for movie in movies:
+                source_seeds = json.loads(existing_seeds.get(movie["TMDB_ID"], "[]"))
+                if seed_name not in source_seeds:
+                    source_seeds.append(seed_name)
+                rows.append((movie["TMDB_ID"], json.dumps(dict(movie, Status="")), json.dumps(source_seeds), now, now, movie.get("Score", 0)))
+            self.db.executemany(
+                "INSERT INTO candidates (tmdb_id, data, source_seeds, first_seen, last_seen, score) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (tmdb_id) DO UPDATE SET data = excluded.data, source_seeds = excluded.source_seeds, last_seen = excluded.last_seen, score = excluded.score",
+                rows,
+            )
+            self.db.commit()
+
+    def set_outcome(self, tmdb_id, outcome):
+        with self.lock:
+            self.db.execute("UPDATE candidates SET outcome = ? WHERE tmdb_id = ?", (outcome, tmdb_id))
+            self.db.commit()
+
+    def get_poster_path(self, tmdb_id):
+        with self.lock:
+            row = self.db.execute("SELECT data FROM candidates WHERE tmdb_id = ?", (tmdb_id,)).fetchone()
+        return json.loads(row[0]).get("Poster_Path") if row else None
+
+    def get_page(self, after, limit):
+        # Keyset pagination on (score, tmdb_id), so rescoring between pages cannot shift later rows past the cursor.
+        with self.lock:
+            if after is None:
+                rows = self.db.execute("SELECT score, tmdb_id, data FROM candidates WHERE outcome IS NULL ORDER BY score DESC, tmdb_id DESC LIMIT ?", (limit,)).fetchall()
+            else:
+                rows = self.db.execute(
+                    "SELECT score, tmdb_id, data FROM candidates WHERE outcome IS NULL AND (score, tmdb_id) < (?, ?) ORDER BY score DESC, tmdb_id DESC LIMIT ?",
+                    (after[0], after[1], limit),
+                ).fetchall()
+        cursor = (rows[-1][0], rows[-1][1]) if rows else after
+        return [json.loads(row[2]) for row in rows], cursor
+
+
+class SharedState:
+    def __init__(self, db_path):
+        # Workers forked by the same gunicorn master share a boot ID, so leases from an earlier run can be told apart.
+        self.boot_id = os.environ.get("RADAREC_BOOT_ID") or f"{os.getpid()}-{random.getrandbits(32):08x}"
+        self.owner = f"{self.boot_id}:{os.getpid()}"
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS library (tmdb_id INTEGER PRIMARY KEY, name TEXT NOT NULL, year INTEGER NOT NULL, radarr_id INTEGER NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS library_version (id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL)")
+        self.db.execute("INSERT OR IGNORE INTO library_version (id, version) VALUES (0, 0)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS worker_metrics (owner TEXT PRIMARY KEY, updated_at REAL NOT NULL, samples TEXT NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS settings (id INTEGER PRIMARY KEY CHECK (id = 0), boot_id TEXT NOT NULL, version INTEGER NOT NULL, data TEXT NOT NULL)")
+        self.db.execute("DELETE FROM leases WHERE substr(owner, 1, ?) != ?", (len(self.boot_id) + 1, f"{self.boot_id}:"))
+        self.db.execute("DELETE FROM worker_metrics WHERE substr(owner, 1, ?) != ?", (len(self.boot_id) + 1, f"{self.boot_id}:"))
+        # Settings changed during an earlier run are already in settings_config.json, which a new boot loads instead.
+        self.db.execute("DELETE FROM settings WHERE boot_id != ?", (self.boot_id,))
+
+    def get_library_version(self):
+        with self.lock:
+            return self.db.execute("SELECT version FROM library_version").fetchone()[0]
+
+    def load_library(self):
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                version = self.db.execute("SELECT version FROM library_version").fetchone()[0]
+                rows = self.db.execute("SELECT name, year, tmdb_id, radarr_id FROM library").fetchall()
+            finally:
+                self.db.execute("COMMIT")
+        radarr_items = [RadarrMovie(name=name, year=year, tmdb_id=tmdb_id, radarr_id=radarr_id) for name, year, tmdb_id, radarr_id in rows]
+        radarr_items.sort(key=lambda x: x.name.lower())
+        return version, radarr_items
+
+    def write_library(self, radarr_items, replace_all=False):
+        rows = [(item.tmdb_id, item.name, item.year or 0, item.radarr_id or 0) for item in radarr_items]
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                previous_version = self.db.execute("SELECT version FROM library_version").fetchone()[0]
+                if replace_all:
+                    self.db.execute("DELETE FROM library")
+                self.db.executemany("INSERT OR REPLACE INTO library (tmdb_id, name, year, radarr_id) VALUES (?, ?, ?, ?)", rows)
+                self.db.execute("UPDATE library_version SET version = ?", (previous_version + 1,))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        return previous_version, previous_version + 1
+
+    def get_settings_version(self):
+        with self.lock:
+            row = self.db.execute("SELECT version FROM settings").fetchone()
+        return row[0] if row else 0
+
+    def load_settings(self):
+        with self.lock:
+            row = self.db.execute("SELECT version, data FROM settings").fetchone()
+        return (row[0], json.loads(row[1])) if row else (0, {})
+
+    def write_settings(self, settings):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute("SELECT version FROM settings").fetchone()
+                version = (row[0] if row else 0) + 1
+                self.db.execute("INSERT OR REPLACE INTO settings (id, boot_id, version, data) VALUES (0, ?, ?, ?)", (self.boot_id, version, json.dumps(settings)))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        return version
+
+    def acquire_lease(self, name, ttl):
+        now = time.time()
+        with self.lock:
+            cursor = self.db.execute(
+                """
+                INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.expires_at < ? OR leases.owner = excluded.owner
+                """,
+                (name, self.owner, now + ttl, now),
+            )
+        return cursor.rowcount == 1
+
+    def release_lease(self, name):
+        with self.lock:
+            self.db.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner))
+
+    def publish_metrics(self, samples):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO worker_metrics (owner, updated_at, samples) VALUES (?, ?, ?)", (self.owner, time.time(), json.dumps(samples)))
+
+    def load_metrics(self, max_age):
+        with self.lock:
+            rows = self.db.execute("SELECT samples FROM worker_metrics WHERE updated_at >= ?", (time.time() - max_age,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+class BatchEmitter:
+    def __init__(self, send, max_size, max_delay):
+        self.send = send
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.pending = []
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def add(self, items):
+        with self.lock:
+            self.pending.extend(items)
+            if len(self.pending) < self.max_size:
+                if self.timer is None:
+                    self.timer = threading.Timer(self.max_delay, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            items, self.pending = self.pending, []
+        if items:
+            self.send(items)
+
+    def clear(self):
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            self.pending = []
+
+
+class SearchSession:
+    def __init__(self, data_handler, sid):
+        self.data_handler = data_handler
+        self.sid = sid
+        self.radarec_logger = data_handler.radarec_logger
+        self.search_lock = threading.Lock()
+        self.new_found_movies_counter = 0
+        self.selected_tmdb_ids = set()
+        self.movies_to_use_in_search = []
+        self.recommended_movies = []
+        self.recommendations_by_tmdb_id = {}
+        self.recommendation_index = {}
+        self.stop_event = threading.Event()
+        self.stop_event.set()
+        self.search_executor = None
+        self.ranker = RecommendationRanker(data_handler.minimum_votes)
+        self.prefetch_condition = threading.Condition()
+        self.prefetch_thread = None
+        self.prefetch_active = False
+        self.cards_requested = 0
+        self.stored_movies_cursor = None
+        self.card_emitter = BatchEmitter(lambda cards: self.emit("more_movies_loaded", cards), max_size=data_handler.prefetch_batch_size, max_delay=0.25)
+        self.score_emitter = BatchEmitter(lambda scores: self.emit("movie_scores_updated", scores), max_size=100, max_delay=1.0)
+
+    def emit(self, event, data=None):
+        if self.sid is not None:
+            socketio.emit(event, data, to=self.sid)
+
+    def start(self, data):
+        self.stop()
+        try:
+            self.data_handler.sync_library()
+            self.emit("clear")
+            self.new_found_movies_counter = 0
+            self.movies_to_use_in_search = []
+            self.recommended_movies = []
+            self.stored_movies_cursor = None
+            with self.prefetch_condition:
+                self.ranker = RecommendationRanker(self.data_handler.minimum_votes)
+                self.cards_requested = self.data_handler.prefetch_batch_size
+            self.rebuild_recommendation_indexes()
+
+            self.selected_tmdb_ids = {int(tmdb_id) for tmdb_id in data}
+            recommendation_sources = ["recommendations", "similar"] if self.data_handler.include_similar_movies else ["recommendations"]
+            for item in self.data_handler.radarr_items:
+                if item.tmdb_id in self.selected_tmdb_ids:
+                    seed_movie = {
+                        "name": item.name,
+                        "year": item.year,
+                        "tmdb_id": item.tmdb_id,
+                        "next_pages": {source: 1 for source in recommendation_sources},
+                        "failures": 0,
+                        "searches": 0,
+                    }
+                    self.movies_to_use_in_search.append(seed_movie)
+
+            if self.movies_to_use_in_search:
+                metrics.inc("radarec_searches_started_total")
+                self.stop_event.clear()
+            else:
+                self.stop_event.set()
+                raise Exception("No Radarr Movies Selected")
+
+        except Exception as e:
+            self.radarec_logger.error(f"Startup Error: {str(e)}")
+            self.stop_event.set()
+            ret = {"Status": "Error", "Code": str(e), "Data": self.get_sidebar_items(), "Version": self.data_handler.library_version, "Running": not self.stop_event.is_set()}
+            self.emit("radarr_sidebar_update", ret)
+
+        else:
+            self.prefetch_active = True
+            self.prefetch_thread = threading.Thread(target=self.prefetch_movies, name="Prefetch_Thread")
+            self.prefetch_thread.daemon = True
+            self.prefetch_thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        executor = self.search_executor
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        with self.prefetch_condition:
+            self.ranker.clear()
+            self.cards_requested = 0
+            self.prefetch_condition.notify_all()
+        self.card_emitter.clear()
+        self.score_emitter.clear()
+
+    def get_sidebar_items(self):
+        return [item.to_dict(item.tmdb_id in self.selected_tmdb_ids) for item in self.data_handler.radarr_items]
+
+    def prefetch_movies(self):
+        low_water_mark = self.data_handler.prefetch_buffer_size // 2
+        while not self.stop_event.is_set() and self.prefetch_thread is threading.current_thread():
+            with self.prefetch_condition:
+                if len(self.ranker) >= self.data_handler.prefetch_buffer_size:
+                    self.prefetch_condition.wait_for(lambda: self.stop_event.is_set() or len(self.ranker) < low_water_mark)
+            if self.stop_event.is_set() or self.prefetch_thread is not threading.current_thread():
+                break
+            if not self.find_similar_movies():
+                break
+        if self.prefetch_thread is threading.current_thread():
+            self.prefetch_active = False
+            self.deliver_movies()
+
+    def load_more_movies(self):
+        if self.stop_event.is_set():
+            self.load_stored_movies()
+            return
+        batch_size = self.data_handler.prefetch_batch_size
+        with self.prefetch_condition:
+            self.cards_requested = min(self.cards_requested + batch_size, 2 * batch_size)
+        self.deliver_movies()
+
+    def load_stored_movies(self):
+        page_size = self.data_handler.prefetch_batch_size
+        stored_movies, self.stored_movies_cursor = self.data_handler.recommendation_store.get_page(self.stored_movies_cursor, page_size)
+        with self.prefetch_condition:
+            movies = [movie for movie in stored_movies if movie["TMDB_ID"] not in self.recommendations_by_tmdb_id and movie["TMDB_ID"] not in self.data_handler.library_tmdb_ids]
+            movies.sort(key=lambda movie: movie.get("Score", 0), reverse=True)
+            self.recommended_movies.extend(movies)
+            for movie in movies:
+                self.recommendations_by_tmdb_id[movie["TMDB_ID"]] = movie
+                self.recommendation_index[(movie["Name"], movie["Year"])] = movie
+        if movies:
+            self.emit("more_movies_loaded", [self.data_handler.to_card(movie) for movie in movies])
+
+    def deliver_movies(self):
+        search_exhausted = False
+        with self.prefetch_condition:
+            movies = []
+            while self.cards_requested > 0 and self.ranker:
+                movies.append(self.ranker.pop())
+                self.cards_requested -= 1
+            self.recommended_movies.extend(movies)
+            if self.cards_requested > 0 and not self.ranker and not self.prefetch_active and not self.stop_event.is_set():
+                self.cards_requested = 0
+                search_exhausted = True
+            self.prefetch_condition.notify_all()
+
+        if movies:
+            metrics.inc("radarec_cards_delivered_total", len(movies))
+            self.card_emitter.add([self.data_handler.to_card(movie) for movie in movies])
+        if search_exhausted:
+            metrics.inc("radarec_search_exhausted_total")
+            self.card_emitter.flush()
+            self.score_emitter.flush()
+            self.radarec_logger.info("Search Exhausted - Try selecting more movies from existing Radarr library")
+            self.emit("new_toast_msg", {"title": "Search Exhausted", "message": "Try selecting more movies from existing Radarr library"})
+
+    def rebuild_recommendation_indexes(self):
+        movies = self.recommended_movies + list(self.ranker.pending.values())
+        self.recommendations_by_tmdb_id = {movie["TMDB_ID"]: movie for movie in movies}
+        self.recommendation_index = {(movie["Name"], movie["Year"]): movie for movie in movies}
+
+    def add_recommendation(self, movie, seed_name, rank):
+        self.recommendations_by_tmdb_id[movie["TMDB_ID"]] = movie
+        self.recommendation_index[(movie["Name"], movie["Year"])] = movie
+        with self.prefetch_condition:
+            self.ranker.add_hit(movie, seed_name, rank)
+            self.ranker.push(movie)
+        self.data_handler.prefetch_poster(movie)
+
+    def rescore_recommendation(self, movie, seed_name, rank):
+        with self.prefetch_condition:
+            previous_score = movie["Score"]
+            score = self.ranker.add_hit(movie, seed_name, rank)
+            delivered = movie["TMDB_ID"] not in self.ranker.pending
+        if delivered and score != previous_score:
+            self.score_emitter.add([{"TMDB_ID": movie["TMDB_ID"], "Score": score}])
+
+    def dismiss_movie(self, tmdb_id):
+        try:
+            self.data_handler.recommendation_store.set_outcome(tmdb_id, "dismissed")
+            movie = self.recommendations_by_tmdb_id.get(tmdb_id)
+            if movie:
+                movie["Status"] = "Dismissed"
+        except Exception as e:
+            self.radarec_logger.error(f"Dismiss Movie Error: {str(e)}")
+
+    def load_overview(self, tmdb_id):
+        try:
+            movie = self.recommendations_by_tmdb_id[tmdb_id]
+            data = {
+                "TMDB_ID": movie["TMDB_ID"],
+                "Name": movie["Name"],
+                "Overview": movie["Overview"],
+                "Language": movie["Language"],
+                "Popularity": movie["Popularity"],
+                "Base_Movie": movie["Base_Movie"],
+            }
+            self.emit("overview_loaded", data)
+        except Exception as e:
+            self.radarec_logger.error(f"Overview Error: {str(e)}")
+
+    def request_seed_recommendations(self, seed_movie):
+        if self.stop_event.is_set():
+            return []
+        movie_id = seed_movie["tmdb_id"] or self.data_handler.request_movie_id(seed_movie["name"], str(seed_movie["year"]))
+        if not movie_id:
+            seed_movie["next_pages"].clear()
+            return []
+        seed_movie["tmdb_id"] = movie_id
+
+        ret_list = []
+        for source, page in list(seed_movie["next_pages"].items()):
+            related_movies, total_pages = self.data_handler.request_similar_movies(movie_id, source, page)
+            ret_list.extend(((page - 1) * TMDB_PAGE_SIZE + position, movie) for position, movie in enumerate(related_movies))
+            if page >= total_pages:
+                del seed_movie["next_pages"][source]
+            else:
+                seed_movie["next_pages"][source] = page + 1
+        return ret_list
+
+    def search_seed_movies(self, seed_movies):
+        try:
+            self.search_executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.data_handler.search_concurrency, thread_name_prefix="Seed_Search")
+            futures = {self.search_executor.submit(self.request_seed_recommendations, seed_movie): seed_movie for seed_movie in seed_movies}
+
+            for future in concurrent.futures.as_completed(futures):
+                if self.stop_event.is_set() or self.prefetch_thread is not threading.current_thread():
+                    break
+                seed_movie = futures[future]
+                try:
+                    related_movies = future.result()
+                except Exception as e:
+                    self.radarec_logger.error(f"TheMovieDB Error for '{seed_movie['name']}': {str(e)}")
+                    seed_movie["failures"] += 1
+                    if seed_movie["failures"] >= 3:
+                        seed_movie["next_pages"].clear()
+                    continue
+
+                known_candidates = self.data_handler.recommendation_store.get_candidates([movie.get("id", "") for _, movie in related_movies])
+                candidates = []
+                filtered = collections.Counter()
+                for rank, movie in related_movies:
+                    if self.stop_event.is_set():
+                        break
+                    tmdb_id = movie.get("id", "")
+                    if tmdb_id in self.data_handler.library_tmdb_ids or normalize_title(movie["title"]) in self.data_handler.library_titles:
+                        filtered["library"] += 1
+                        continue
+                    outcome, pooled_movie = known_candidates.get(tmdb_id, (None, None))
+                    if outcome:
+                        filtered["history"] += 1
+                        continue
+                    if tmdb_id in self.recommendations_by_tmdb_id:
+                        filtered["dedup"] += 1
+                        known_movie = self.recommendations_by_tmdb_id[tmdb_id]
+                        self.rescore_recommendation(known_movie, seed_movie["name"], rank)
+                        candidates.append(known_movie)
+                        continue
+                    exclusive_movie = pooled_movie or self.data_handler.build_recommendation(movie, seed_movie["name"])
+                    candidates.append(exclusive_movie)
+                    self.add_recommendation(exclusive_movie, seed_movie["name"], rank)
+                    self.new_found_movies_counter += 1
+                    metrics.inc("radarec_candidates_found_total")
+
+                for reason, count in filtered.items():
+                    metrics.inc("radarec_candidates_filtered_total", count, reason=reason)
+
+                self.data_handler.recommendation_store.record_candidates(candidates, seed_movie["name"])
+                self.deliver_movies()
+
+        finally:
+            if self.search_executor:
+                self.search_executor.shutdown(wait=False, cancel_futures=True)
+                self.search_executor = None
+
+    def find_similar_movies(self):
+        self.search_lock.acquire()
+        try:
+            self.radarec_logger.info(f"Searching for new movies")
+            self.new_found_movies_counter = 0
+
+            while self.new_found_movies_counter == 0 and not self.stop_event.is_set() and self.prefetch_thread is threading.current_thread():
+                active_seeds = [seed_movie for seed_movie in self.movies_to_use_in_search if seed_movie["next_pages"]]
+                if not active_seeds:
+                    break
+                least_searched_seeds = sorted(active_seeds, key=lambda seed_movie: (seed_movie["searches"], random.random()))[:8]
+                for seed_movie in least_searched_seeds:
+                    seed_movie["searches"] += 1
+                self.search_seed_movies(least_searched_seeds)
+
+        except Exception as e:
+            self.radarec_logger.error(f"TheMovieDB Error: {str(e)}")
+
+        finally:
+            self.search_lock.release()
+            self.radarec_logger.info(f"TMDB Cache Stats: {self.data_handler.tmdb_cache.get_stats()}")
+
+        return any(seed_movie["next_pages"] for seed_movie in self.movies_to_use_in_search)
 
 
 class DataHandler:
@@ -25,18 +1081,58 @@ class DataHandler:
         self.radarec_logger.warning(f"{app_name_text} Version: {release_version}\n")
         self.radarec_logger.warning(f"{'*' * 50}")
 
-        self.search_in_progress_flag = False
-        self.new_found_movies_counter = 0
         self.clients_connected_counter = 0
         self.config_folder = "config"
-        self.recommended_movies = []
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
         self.radarr_items = []
-        self.cleaned_radarr_items = []
-        self.stop_event = threading.Event()
-        self.stop_event.set()
+        self.radarr_sort_keys = []
+        self.library_titles = set()
+        self.library_tmdb_ids = set()
+        self.library_version = 0
+        self.settings_version = 0
+        self.library_lock = threading.Lock()
+        self.tmdb_inflight_requests = {}
+        self.tmdb_inflight_lock = threading.Lock()
+        self.poster_inflight_requests = {}
+        self.poster_inflight_lock = threading.Lock()
+        self.queued_movies = set()
+        self.add_queue_lock = threading.Lock()
+        self.add_workers = []
+        self.worker_count = max(int(os.environ.get("GUNICORN_WORKERS", "") or 1), 1)
         if not os.path.exists(self.config_folder):
             os.makedirs(self.config_folder)
         self.load_environ_or_config_settings()
+        self.tmdb_client = UpstreamClient(
+            "TMDB",
+            pool_size=self.http_pool_size,
+            timeout=self.tmdb_api_timeout,
+            max_retries=self.http_max_retries,
+            rate_limiter=TokenBucket(rate=self.tmdb_rate_limit / self.worker_count, capacity=max(self.tmdb_rate_limit / self.worker_count, 1)),
+        )
+        self.radarr_client = UpstreamClient("Radarr", pool_size=self.http_pool_size, timeout=self.radarr_api_timeout, max_retries=self.http_max_retries)
+        self.add_queue = queue.Queue(maxsize=self.add_queue_size)
+        self.library_additions = BatchEmitter(self.add_to_library, max_size=25, max_delay=0.5)
+        self.tmdb_image_client = UpstreamClient("TMDB Images", pool_size=self.http_pool_size, timeout=self.tmdb_api_timeout, max_retries=self.http_max_retries)
+        self.poster_cache = PosterCache(os.path.join(self.config_folder, "posters"), max_bytes=self.poster_cache_size * 1024 * 1024)
+        self.poster_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="Poster_Prefetch")
+        self.recommendation_store = RecommendationStore(os.path.join(self.config_folder, "recommendations.db"))
+        self.shared_state = SharedState(os.path.join(self.config_folder, "shared_state.db"))
+        self.tmdb_cache = TMDBCache(
+            os.path.join(self.config_folder, "tmdb_cache.db"),
+            memory_size=self.tmdb_cache_size,
+            max_disk_entries=self.tmdb_cache_max_disk_entries,
+            ttls={
+                "search": self.tmdb_search_cache_ttl * 3600,
+                "recommendations": self.tmdb_recommendations_cache_ttl * 3600,
+                "similar": self.tmdb_recommendations_cache_ttl * 3600,
+            },
+        )
+        self.register_metrics()
+        startup_loader_thread = threading.Thread(target=self.load_persisted_state, name="Startup_Loader")
+        startup_loader_thread.daemon = True
+        startup_loader_thread.start()
+        self.start_schedulers()
         if self.auto_start:
             try:
                 auto_start_thread = threading.Timer(self.auto_start_delay, self.automated_startup)
@@ -46,6 +1142,19 @@ class DataHandler:
             except Exception as e:
                 self.radarec_logger.error(f"Auto Start Error: {str(e)}")
 
+    def register_metrics(self):
+        metrics.register_callback("radarec_connected_clients", "gauge", "Socket.IO clients currently connected.", lambda: self.clients_connected_counter)
+        metrics.register_callback("radarec_threads", "gauge", "Threads currently running in the process.", threading.active_count)
+        metrics.register_callback("radarec_add_queue_depth", "gauge", "Movies waiting to be added to Radarr.", self.add_queue.qsize)
+        metrics.register_callback("radarec_library_movies", "gauge", "Movies in the cached Radarr library.", lambda: len(self.radarr_items))
+        metrics.register_callback("radarec_candidate_pool_size", "gauge", "Pending recommendations in the persistent candidate pool.", self.recommendation_store.count_pending)
+        metrics.register_callback(
+            "radarec_tmdb_cache_events_total",
+            "counter",
+            "TMDB response cache hits, misses and evictions.",
+            lambda: [({"event": event}, value) for event, value in self.tmdb_cache.get_stats().items() if event != "memory_entries"],
+        )
+
     def load_environ_or_config_settings(self):
         # Defaults
         default_settings = {
@@ -53,17 +1162,40 @@ class DataHandler:
             "radarr_api_key": "",
             "root_folder_path": "/data/media/movies/",
             "tmdb_api_key": "",
+            "tmdb_api_url": "https://api.themoviedb.org/3",
+            "tmdb_image_url": "https://image.tmdb.org/t/p",
             "fallback_to_top_result": False,
             "radarr_api_timeout": 120.0,
+            "search_concurrency": 4,
+            "tmdb_api_timeout": 10.0,
+            "tmdb_rate_limit": 20.0,
+            "http_pool_size": 10,
+            "http_max_retries": 3,
             "quality_profile_id": 1,
             "metadata_profile_id": 1,
             "search_for_movie": False,
             "dry_run_adding_to_radarr": False,
+            "add_concurrency": 2,
+            "add_queue_size": 500,
             "minimum_rating": 5.5,
             "minimum_votes": 50,
             "language_choice": "all",
+            "include_similar_movies": False,
+            "prefetch_buffer_size": 60,
+            "prefetch_batch_size": 20,
             "auto_start": False,
             "auto_start_delay": 60,
+            "discovery_interval": 0,
+            "discovery_request_budget": 200,
+            "library_refresh_interval": 0,
+            "tmdb_cache_size": 1000,
+            "tmdb_cache_max_disk_entries": 50000,
+            "tmdb_search_cache_ttl": 720,
+            "tmdb_recommendations_cache_ttl": 168,
+            "poster_size": "w342",
+            "poster_cache_size": 200,
+            "prefetch_posters": True,
+            "enable_profiler": False,
         }
 
         # Load settings from environmental variables (which take precedence) over the configuration file.
@@ -71,10 +1203,22 @@ class DataHandler:
         self.radarr_api_key = os.environ.get("radarr_api_key", "")
         self.root_folder_path = os.environ.get("root_folder_path", "")
         self.tmdb_api_key = os.environ.get("tmdb_api_key", "")
+        self.tmdb_api_url = os.environ.get("tmdb_api_url", "")
+        self.tmdb_image_url = os.environ.get("tmdb_image_url", "")
         fallback_to_top_result = os.environ.get("fallback_to_top_result", "")
         self.fallback_to_top_result = fallback_to_top_result.lower() == "true" if fallback_to_top_result != "" else ""
         radarr_api_timeout = os.environ.get("radarr_api_timeout", "")
         self.radarr_api_timeout = float(radarr_api_timeout) if radarr_api_timeout else ""
+        search_concurrency = os.environ.get("search_concurrency", "")
+        self.search_concurrency = int(search_concurrency) if search_concurrency else ""
+        tmdb_api_timeout = os.environ.get("tmdb_api_timeout", "")
+        self.tmdb_api_timeout = float(tmdb_api_timeout) if tmdb_api_timeout else ""
+        tmdb_rate_limit = os.environ.get("tmdb_rate_limit", "")
+        self.tmdb_rate_limit = float(tmdb_rate_limit) if tmdb_rate_limit else ""
+        http_pool_size = os.environ.get("http_pool_size", "")
+        self.http_pool_size = int(http_pool_size) if http_pool_size else ""
+        http_max_retries = os.environ.get("http_max_retries", "")
+        self.http_max_retries = int(http_max_retries) if http_max_retries else ""
         quality_profile_id = os.environ.get("quality_profile_id", "")
         self.quality_profile_id = int(quality_profile_id) if quality_profile_id else ""
         metadata_profile_id = os.environ.get("metadata_profile_id", "")
@@ -83,15 +1227,46 @@ class DataHandler:
         self.search_for_movie = search_for_movie.lower() == "true" if search_for_movie != "" else ""
         dry_run_adding_to_radarr = os.environ.get("dry_run_adding_to_radarr", "")
         self.dry_run_adding_to_radarr = dry_run_adding_to_radarr.lower() == "true" if dry_run_adding_to_radarr != "" else ""
+        add_concurrency = os.environ.get("add_concurrency", "")
+        self.add_concurrency = int(add_concurrency) if add_concurrency else ""
+        add_queue_size = os.environ.get("add_queue_size", "")
+        self.add_queue_size = int(add_queue_size) if add_queue_size else ""
         minimum_rating = os.environ.get("minimum_rating", "")
         self.minimum_rating = float(minimum_rating) if minimum_rating else ""
         minimum_votes = os.environ.get("minimum_votes", "")
         self.minimum_votes = int(minimum_votes) if minimum_votes else ""
         self.language_choice = os.environ.get("language_choice", "")
+        include_similar_movies = os.environ.get("include_similar_movies", "")
+        self.include_similar_movies = include_similar_movies.lower() == "true" if include_similar_movies != "" else ""
+        prefetch_buffer_size = os.environ.get("prefetch_buffer_size", "")
+        self.prefetch_buffer_size = int(prefetch_buffer_size) if prefetch_buffer_size else ""
+        prefetch_batch_size = os.environ.get("prefetch_batch_size", "")
+        self.prefetch_batch_size = int(prefetch_batch_size) if prefetch_batch_size else ""
         auto_start = os.environ.get("auto_start", "")
         self.auto_start = auto_start.lower() == "true" if auto_start != "" else ""
         auto_start_delay = os.environ.get("auto_start_delay", "")
         self.auto_start_delay = float(auto_start_delay) if auto_start_delay else ""
+        discovery_interval = os.environ.get("discovery_interval", "")
+        self.discovery_interval = float(discovery_interval) if discovery_interval else ""
+        discovery_request_budget = os.environ.get("discovery_request_budget", "")
+        self.discovery_request_budget = int(discovery_request_budget) if discovery_request_budget else ""
+        library_refresh_interval = os.environ.get("library_refresh_interval", "")
+        self.library_refresh_interval = float(library_refresh_interval) if library_refresh_interval else ""
+        tmdb_cache_size = os.environ.get("tmdb_cache_size", "")
+        self.tmdb_cache_size = int(tmdb_cache_size) if tmdb_cache_size else ""
+        tmdb_cache_max_disk_entries = os.environ.get("tmdb_cache_max_disk_entries", "")
+        self.tmdb_cache_max_disk_entries = int(tmdb_cache_max_disk_entries) if tmdb_cache_max_disk_entries else ""
+        tmdb_search_cache_ttl = os.environ.get("tmdb_search_cache_ttl", "")
+        self.tmdb_search_cache_ttl = float(tmdb_search_cache_ttl) if tmdb_search_cache_ttl else ""
+        tmdb_recommendations_cache_ttl = os.environ.get("tmdb_recommendations_cache_ttl", "")
+        self.tmdb_recommendations_cache_ttl = float(tmdb_recommendations_cache_ttl) if tmdb_recommendations_cache_ttl else ""
+        self.poster_size = os.environ.get("poster_size", "")
+        poster_cache_size = os.environ.get("poster_cache_size", "")
+        self.poster_cache_size = int(poster_cache_size) if poster_cache_size else ""
+        prefetch_posters = os.environ.get("prefetch_posters", "")
+        self.prefetch_posters = prefetch_posters.lower() == "true" if prefetch_posters != "" else ""
+        enable_profiler = os.environ.get("enable_profiler", "")
+        self.enable_profiler = enable_profiler.lower() == "true" if enable_profiler != "" else ""
 
         # Load variables from the configuration file if not set by environmental variables.
         try:
@@ -114,112 +1289,450 @@ class DataHandler:
         # Save config.
         self.save_config_to_file()
 
-    def automated_startup(self):
-        self.request_movies_from_radarr(checked=True)
-        items = [x["name"] for x in self.radarr_items]
-        self.start(items)
-
-    def connection(self):
-        if self.recommended_movies:
-            if self.clients_connected_counter == 0:
-                if len(self.recommended_movies) > 25:
-                    self.recommended_movies = random.sample(self.recommended_movies, 25)
-                else:
-                    self.radarec_logger.info(f"Shuffling Movies")
-                    random.shuffle(self.recommended_movies)
-            socketio.emit("more_movies_loaded", self.recommended_movies)
-
-        self.clients_connected_counter += 1
-
-    def disconnection(self):
-        self.clients_connected_counter = max(0, self.clients_connected_counter - 1)
-
-    def start(self, data):
+    def load_persisted_state(self):
         try:
-            socketio.emit("clear")
-            self.new_found_movies_counter = 1
-            self.movies_to_use_in_search = []
-            self.recommended_movies = []
+            self.sync_library()
+            self.poster_cache.load()
+            self.radarec_logger.info(f"Loaded {len(self.radarr_items)} library movies and {len(self.poster_cache.entries)} cached posters")
+        except Exception as e:
+            self.radarec_logger.error(f"Startup Loading Error: {str(e)}")
 
-            for item in self.radarr_items:
-                item_name = item["name"]
-                if item_name in data:
-                    item["checked"] = True
-                    self.movies_to_use_in_search.append(item_name)
-                else:
-                    item["checked"] = False
+    def automated_startup(self):
+        # Every worker's timer fires auto_start_delay after the server starts; the lease only has to outlast that skew.
+        if not self.acquire_shared_lease("auto_start", ttl=60):
+            return
+        self.sync_library()
+        if self.radarr_items:
+            # Search from the stored library snapshot straight away and refresh it from Radarr alongside.
+            library_refresh_thread = threading.Thread(target=self.request_movies_from_radarr, name="Library_Refresh")
+            library_refresh_thread.daemon = True
+            library_refresh_thread.start()
+        else:
+            self.request_movies_from_radarr()
+        items = [x.tmdb_id for x in self.radarr_items]
+        session = SearchSession(self, None)
+        with self.sessions_lock:
+            self.sessions[None] = session
+        session.start(items)
+
+    def start_schedulers(self):
+        scheduled_tasks = [
+            ("Discovery_Scheduler", self.discovery_interval, self.run_scheduled_discovery),
+            ("Library_Refresh_Scheduler", self.library_refresh_interval, self.request_movies_from_radarr),
+        ]
+        for name, interval, task in scheduled_tasks:
+            if interval > 0:
+                scheduler_thread = threading.Thread(target=self.run_scheduler, args=(name, interval * 60, task), name=name)
+                scheduler_thread.daemon = True
+                scheduler_thread.start()
+        if self.worker_count > 1:
+            worker_sync_thread = threading.Thread(target=self.run_worker_sync, name="Worker_Sync")
+            worker_sync_thread.daemon = True
+            worker_sync_thread.start()
+
+    def run_scheduler(self, name, interval, task):
+        time.sleep(min(self.auto_start_delay, interval))
+        while True:
+            started_at = time.monotonic()
+            try:
+                # Workers share one schedule; whoever holds the lease for this interval runs the task.
+                if self.acquire_shared_lease(f"scheduler:{name}", ttl=interval * 0.9):
+                    task()
+            except Exception as e:
+                self.radarec_logger.error(f"Scheduled Task Error: {str(e)}")
+            time.sleep(max(interval - (time.monotonic() - started_at), 0))
 
-            if self.movies_to_use_in_search:
-                self.stop_event.clear()
+    def run_worker_sync(self, interval=5, poster_rescan_interval=60):
+        last_poster_rescan = time.monotonic()
+        while True:
+            time.sleep(interval)
+            try:
+                self.sync_library()
+                self.sync_settings()
+                self.publish_metrics()
+                # Other workers add and evict posters too, so the size limit is enforced against what is on disk.
+                if time.monotonic() - last_poster_rescan >= poster_rescan_interval:
+                    last_poster_rescan = time.monotonic()
+                    self.poster_cache.load()
+            except Exception as e:
+                self.radarec_logger.error(f"Worker Sync Error: {str(e)}")
+
+    def sync_settings(self):
+        if self.shared_state.get_settings_version() == self.settings_version:
+            return
+        version, settings = self.shared_state.load_settings()
+        for key, value in settings.items():
+            setattr(self, key, value)
+        self.settings_version = version
+
+    def publish_metrics(self):
+        self.shared_state.publish_metrics(metrics.collect(worker=os.getpid()))
+
+    def render_metrics(self):
+        if self.worker_count == 1:
+            return metrics.render()
+        # A scrape reaches a single worker, so it answers with every live worker's series, each labelled by worker.
+        self.publish_metrics()
+        samples = collections.defaultdict(list)
+        for worker_samples in self.shared_state.load_metrics(max_age=30):
+            for name, lines in worker_samples.items():
+                samples[name].extend(lines)
+        return metrics.render(samples)
+
+    def acquire_shared_lease(self, name, ttl):
+        if self.worker_count == 1:
+            return True
+        return self.shared_state.acquire_lease(name, ttl)
+
+    def run_scheduled_discovery(self):
+        self.sync_library()
+        if not self.radarr_items:
+            self.request_movies_from_radarr()
+        seed_names = {item.tmdb_id: item.name for item in self.radarr_items}
+        recommendation_sources = ["recommendations", "similar"] if self.include_similar_movies else ["recommendations"]
+        ranker = RecommendationRanker(self.minimum_votes)
+        # Only requests that actually reach TMDB count against the budget; cached pages are free.
+        first_request_count = self.tmdb_client.get_thread_request_count()
+        request_limit = first_request_count + self.discovery_request_budget
+        seeds_searched = 0
+        candidates_pooled = 0
+
+        self.radarec_logger.info(f"Scheduled discovery started with a budget of {self.discovery_request_budget} TMDB requests")
+        for tmdb_id, next_pages in self.recommendation_store.select_seeds(list(seed_names), self.discovery_request_budget, retire_for=self.tmdb_recommendations_cache_ttl * 3600):
+            if self.tmdb_client.get_thread_request_count() >= request_limit:
+                break
+            if next_pages is None:
+                next_pages = {source: 1 for source in recommendation_sources}
+            related_movies = []
+            try:
+                for source, page in list(next_pages.items()):
+                    if self.tmdb_client.get_thread_request_count() >= request_limit:
+                        break
+                    movies, total_pages = self.request_similar_movies(tmdb_id, source, page)
+                    related_movies.extend(((page - 1) * TMDB_PAGE_SIZE + position, movie) for position, movie in enumerate(movies))
+                    if page >= total_pages:
+                        del next_pages[source]
+                    else:
+                        next_pages[source] = page + 1
+            except Exception as e:
+                self.radarec_logger.error(f"TheMovieDB Error for '{seed_names[tmdb_id]}': {str(e)}")
+            self.recommendation_store.mark_seed_searched(tmdb_id, next_pages)
+            candidates_pooled += self.add_to_candidate_pool(related_movies, seed_names[tmdb_id], ranker)
+            seeds_searched += 1
+
+        metrics.inc("radarec_scheduled_discovery_runs_total")
+        self.radarec_logger.info(f"Scheduled discovery finished: {seeds_searched} seeds searched, {candidates_pooled} candidates pooled, {self.tmdb_client.get_thread_request_count() - first_request_count} TMDB requests made")
+
+    def add_to_candidate_pool(self, related_movies, seed_name, ranker):
+        known_candidates = self.recommendation_store.get_candidates([movie.get("id", "") for _, movie in related_movies])
+        candidates = []
+        for rank, movie in related_movies:
+            tmdb_id = movie.get("id", "")
+            if tmdb_id in self.library_tmdb_ids or normalize_title(movie["title"]) in self.library_titles:
+                continue
+            outcome, pooled_movie = known_candidates.get(tmdb_id, (None, None))
+            if outcome:
+                continue
+            candidate = pooled_movie or self.build_recommendation(movie, seed_name)
+            ranker.add_hit(candidate, seed_name, rank)
+            candidates.append(candidate)
+        self.recommendation_store.record_candidates(candidates, seed_name)
+        return len(candidates)
+
+    def get_session(self, sid):
+        with self.sessions_lock:
+            session = self.sessions.get(sid)
+            if session is None:
+                session = SearchSession(self, sid)
+                self.sessions[sid] = session
+            return session
+
+    def connection(self, sid):
+        with self.sessions_lock:
+            session = self.sessions.pop(None, None)
+            adopted_session = session is not None
+            if adopted_session:
+                self.radarec_logger.info(f"Client {sid} adopted the Auto Start session")
+                session.sid = sid
             else:
-                self.stop_event.set()
-                raise Exception("No Radarr Movies Selected")
+                session = SearchSession(self, sid)
+            self.sessions[sid] = session
+            self.clients_connected_counter = len(self.sessions)
+
+        if not adopted_session:
+            session.load_stored_movies()
+        elif session.recommended_movies:
+            with session.prefetch_condition:
+                session.recommended_movies = heapq.nlargest(25, session.recommended_movies, key=lambda movie: movie.get("Score", 0))
+                session.rebuild_recommendation_indexes()
+            session.emit("more_movies_loaded", [self.to_card(movie) for movie in session.recommended_movies])
+
+    def disconnection(self, sid):
+        with self.sessions_lock:
+            session = self.sessions.pop(sid, None)
+            self.clients_connected_counter = len(self.sessions)
+        if session:
+            session.stop()
+
+    def send_sidebar_update(self, session, client_version=None):
+        self.sync_library()
+        if not self.radarr_items:
+            return
+        if client_version == self.library_version:
+            self.send_library_delta(session, self.library_version, [], [], [])
+        else:
+            ret = {"Status": "Success", "Data": session.get_sidebar_items(), "Version": self.library_version, "Running": not session.stop_event.is_set()}
+            session.emit("radarr_sidebar_update", ret)
+
+    def send_library_delta(self, session, base_version, added, removed, changed):
+        ret = {
+            "Status": "Success",
+            "Base_Version": base_version,
+            "Version": self.library_version,
+            "Added": [item.to_dict(item.tmdb_id in session.selected_tmdb_ids) for item in added],
+            "Removed": removed,
+            "Changed": [item.to_dict(item.tmdb_id in session.selected_tmdb_ids) for item in changed],
+            "Running": not session.stop_event.is_set(),
+        }
+        session.emit("radarr_library_delta", ret)
 
-        except Exception as e:
-            self.radarec_logger.error(f"Startup Error: {str(e)}")
-            self.stop_event.set()
-            ret = {"Status": "Error", "Code": str(e), "Data": self.radarr_items, "Running": not self.stop_event.is_set()}
-            socketio.emit("radarr_sidebar_update", ret)
+    def broadcast_library_delta(self, base_version, added, removed, changed, sid=None):
+        with self.sessions_lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            if added or removed or changed or session.sid == sid:
+                self.send_library_delta(session, base_version, added, removed, changed)
 
+    def sync_library(self):
+        if self.shared_state.get_library_version() == self.library_version:
+            return
+        version, radarr_items = self.shared_state.load_library()
+        if version != self.library_version:
+            self.replace_library(radarr_items, version=version)
+
+    def replace_library(self, radarr_items, sid=None, version=None):
+        radarr_items.sort(key=lambda x: x.name.lower())
+        with self.library_lock:
+            previous_items = {item.tmdb_id: item for item in self.radarr_items}
+            current_items = {item.tmdb_id: item for item in radarr_items}
+            added = [item for tmdb_id, item in current_items.items() if tmdb_id not in previous_items]
+            removed = [tmdb_id for tmdb_id in previous_items if tmdb_id not in current_items]
+            changed = [
+                item
+                for tmdb_id, item in current_items.items()
+                if tmdb_id in previous_items and (item.name, item.year, item.radarr_id) != (previous_items[tmdb_id].name, previous_items[tmdb_id].year, previous_items[tmdb_id].radarr_id)
+            ]
+            self.radarr_items = radarr_items
+            self.radarr_sort_keys = [item.name.lower() for item in radarr_items]
+            self.library_titles = set(self.radarr_sort_keys)
+            self.library_tmdb_ids = set(current_items)
+            base_version = self.library_version
+            if version is not None:
+                self.library_version = version
+            elif added or removed or changed or self.shared_state.get_library_version() != base_version:
+                _, self.library_version = self.shared_state.write_library(radarr_items, replace_all=True)
+
+        if version is None:
+            self.radarec_logger.info(f"Radarr Library Sync: {len(added)} added, {len(removed)} removed, {len(changed)} changed")
+        if base_version == 0:
+            with self.sessions_lock:
+                sessions = list(self.sessions.values())
+            for session in sessions:
+                self.send_sidebar_update(session)
         else:
-            thread = threading.Thread(target=data_handler.find_similar_movies, name="Start_Finding_Thread")
-            thread.daemon = True
-            thread.start()
-
-    def request_movies_from_radarr(self, checked=False):
+            self.broadcast_library_delta(base_version, added, removed, changed, sid)
+
+    def add_to_library(self, radarr_items):
+        with self.library_lock:
+            added = []
+            for item in radarr_items:
+                if item.tmdb_id in self.library_tmdb_ids:
+                    continue
+                sort_key = item.name.lower()
+                position = bisect.bisect_right(self.radarr_sort_keys, sort_key)
+                self.radarr_sort_keys.insert(position, sort_key)
+                self.radarr_items.insert(position, item)
+                self.library_titles.add(sort_key)
+                self.library_tmdb_ids.add(item.tmdb_id)
+                added.append(item)
+            if not added:
+                return
+            base_version = self.library_version
+            shared_version, self.library_version = self.shared_state.write_library(added)
+
+        self.broadcast_library_delta(base_version, added, [], [])
+        if shared_version != base_version:
+            # Another worker changed the library since the last sync, so pick up its changes as well.
+            version, radarr_items = self.shared_state.load_library()
+            self.replace_library(radarr_items, version=version)
+
+    def request_movies_from_radarr(self, sid=None):
         try:
             self.radarec_logger.info(f"Getting Movies from Radarr")
-            self.radarr_items = []
             endpoint = f"{self.radarr_address}/api/v3/movie"
             headers = {"X-Api-Key": self.radarr_api_key}
-            response = requests.get(endpoint, headers=headers, timeout=self.radarr_api_timeout)
-
-            if response.status_code == 200:
-                self.full_radarr_movie_list = response.json()
-                self.radarr_items = [{"name": re.sub(r" \(\d{4}\)", "", unidecode(movie["title"], replace_str=" ")), "checked": checked} for movie in self.full_radarr_movie_list]
-                self.radarr_items.sort(key=lambda x: x["name"].lower())
-                self.cleaned_radarr_items = [item["name"].lower() for item in self.radarr_items]
-                status = "Success"
-                data = self.radarr_items
-            else:
-                status = "Error"
-                data = response.text
+            start_time = time.perf_counter()
+            try:
+                with self.radarr_client.get(endpoint, call="radarr_list", headers=headers, timeout=self.radarr_api_timeout, stream=True) as response:
+                    if response.status_code == 200:
+                        radarr_items = [
+                            RadarrMovie(
+                                name=clean_title(movie["title"]),
+                                year=movie.get("year", 0),
+                                tmdb_id=movie.get("tmdbId", 0),
+                                radarr_id=movie.get("id", 0),
+                            )
+                            for movie in iter_json_array(response.iter_content(chunk_size=65536))
+                        ]
+                    else:
+                        radarr_items = None
+                        response_text = response.text
+            finally:
+                metrics.observe("radarec_upstream_request_seconds", time.perf_counter() - start_time, call="radarr_list")
 
-            ret = {"Status": status, "Code": response.status_code if status == "Error" else None, "Data": data, "Running": not self.stop_event.is_set()}
+            if radarr_items is not None:
+                self.replace_library(radarr_items, sid)
+            elif sid is not None:
+                self.send_radarr_error(sid, response.status_code, response_text)
 
         except Exception as e:
             self.radarec_logger.error(f"Getting Movie Error: {str(e)}")
-            ret = {"Status": "Error", "Code": 500, "Data": str(e), "Running": not self.stop_event.is_set()}
+            if sid is not None:
+                self.send_radarr_error(sid, 500, str(e))
+
+    def send_radarr_error(self, sid, code, data):
+        # The client may have disconnected while Radarr was queried; get_session would bring its session back.
+        with self.sessions_lock:
+            session = self.sessions.get(sid)
+        if session:
+            ret = {"Status": "Error", "Code": code, "Data": data, "Running": not session.stop_event.is_set()}
+            session.emit("radarr_sidebar_update", ret)
+
+    def request_tmdb(self, endpoint, url, params):
+        data = self.tmdb_cache.get(endpoint, {"url": url, **params})
+        if data is not None:
+            return data
+
+        key = self.tmdb_cache.make_key(endpoint, {"url": url, **params})
+        with self.tmdb_inflight_lock:
+            inflight_request = self.tmdb_inflight_requests.get(key)
+            owner = inflight_request is None
+            if owner:
+                inflight_request = concurrent.futures.Future()
+                self.tmdb_inflight_requests[key] = inflight_request
+
+        if not owner:
+            return inflight_request.result()
+
+        lease_name = f"tmdb:{key}"
+        try:
+            # Another worker may already be fetching this response; wait for it to land in the shared cache.
+            lease_deadline = time.monotonic() + self.tmdb_api_timeout * (self.http_max_retries + 1)
+            while not self.acquire_shared_lease(lease_name, ttl=self.tmdb_api_timeout * (self.http_max_retries + 1)):
+                data = self.tmdb_cache.get(endpoint, {"url": url, **params})
+                if data is not None:
+                    inflight_request.set_result(data)
+                    return data
+                if time.monotonic() > lease_deadline:
+                    break
+                time.sleep(0.1)
+
+            data = self.tmdb_cache.get(endpoint, {"url": url, **params})
+            if data is None:
+                response = self.tmdb_client.get(url, call=f"tmdb_{endpoint}", params={"api_key": self.tmdb_api_key, **params})
+                data = response.json()
+                if response.status_code == 200:
+                    self.tmdb_cache.set(endpoint, {"url": url, **params}, data)
+            inflight_request.set_result(data)
+            return data
+
+        except Exception as e:
+            inflight_request.set_exception(e)
+            raise
 
         finally:
-            socketio.emit("radarr_sidebar_update", ret)
+            if self.worker_count > 1:
+                self.shared_state.release_lease(lease_name)
+            with self.tmdb_inflight_lock:
+                del self.tmdb_inflight_requests[key]
+
+    def get_poster(self, tmdb_id):
+        poster_file = self.poster_cache.get(tmdb_id)
+        if poster_file:
+            return poster_file
+        poster_path = self.recommendation_store.get_poster_path(tmdb_id)
+        if not poster_path:
+            return None
+        return self.fetch_poster(tmdb_id, poster_path)
+
+    def fetch_poster(self, tmdb_id, poster_path):
+        with self.poster_inflight_lock:
+            inflight_request = self.poster_inflight_requests.get(tmdb_id)
+            owner = inflight_request is None
+            if owner:
+                inflight_request = concurrent.futures.Future()
+                self.poster_inflight_requests[tmdb_id] = inflight_request
+
+        if not owner:
+            return inflight_request.result()
+
+        poster_file = None
+        try:
+            poster_file = self.poster_cache.get(tmdb_id)
+            if not poster_file:
+                response = self.tmdb_image_client.get(f"{self.tmdb_image_url}/{self.poster_size}{poster_path}", call="tmdb_poster")
+                if response.status_code == 200:
+                    poster_file = self.poster_cache.set(tmdb_id, response.content)
+                else:
+                    self.radarec_logger.warning(f"Poster for TMDB ID {tmdb_id} returned HTTP {response.status_code}")
+
+        except Exception as e:
+            self.radarec_logger.error(f"Poster Error: {str(e)}")
+
+        finally:
+            inflight_request.set_result(poster_file)
+            with self.poster_inflight_lock:
+                del self.poster_inflight_requests[tmdb_id]
+
+        return poster_file
+
+    def prefetch_poster(self, movie):
+        poster_path = movie.get("Poster_Path")
+        if self.prefetch_posters and poster_path and not self.poster_cache.get(movie["TMDB_ID"]):
+            self.poster_executor.submit(self.fetch_poster, movie["TMDB_ID"], poster_path)
 
     def request_movie_id(self, movie_name, movie_year=None):
-        url = f"https://api.themoviedb.org/3/search/movie"
-        params = {"api_key": self.tmdb_api_key, "query": movie_name}
-        response = requests.get(url, params=params)
-        data = response.json()
+        url = f"{self.tmdb_api_url}/search/movie"
+        data = self.request_tmdb("search", url, {"query": movie_name})
         ret = None
         if data:
+            from thefuzz import fuzz
+
             for movie in data["results"]:
                 if fuzz.ratio(movie_name, movie["original_title"]) > 90 and (movie["release_date"][:4] == movie_year or not movie_year):
                     ret = movie["id"]
                     break
         return ret
 
-    def request_similar_movies(self, movie_id):
-        url = f"https://api.themoviedb.org/3/movie/{movie_id}/recommendations"
-        params = {"api_key": self.tmdb_api_key}
-        response = requests.get(url, params=params)
-        data = response.json()
+    def request_similar_movies(self, movie_id, source="recommendations", page=1):
+        url = f"{self.tmdb_api_url}/movie/{movie_id}/{source}"
+        data = self.request_tmdb(source, url, {"page": page})
         ret_list = []
+        filtered = collections.Counter()
 
         for movie in data["results"]:
-            if movie.get("vote_average", 0) >= self.minimum_rating and movie.get("vote_count", 0) >= self.minimum_votes:
-                if movie.get("original_language", "en") == self.language_choice or self.language_choice == "all":
-                    ret_list.append(movie)
+            if movie.get("vote_average", 0) < self.minimum_rating:
+                filtered["rating"] += 1
+            elif movie.get("vote_count", 0) < self.minimum_votes:
+                filtered["votes"] += 1
+            elif movie.get("original_language", "en") != self.language_choice and self.language_choice != "all":
+                filtered["language"] += 1
+            else:
+                ret_list.append(movie)
 
-        return ret_list
+        for reason, count in filtered.items():
+            metrics.inc("radarec_candidates_filtered_total", count, reason=reason)
+        return ret_list, data.get("total_pages", page)
 
     def map_genre_ids_to_names(self, genre_ids):
         genre_mapping = {
@@ -245,98 +1758,111 @@ class DataHandler:
         }
         return [genre_mapping.get(genre_id, "Unknown") for genre_id in genre_ids]
 
-    def find_similar_movies(self):
-        if self.stop_event.is_set() or self.search_in_progress_flag:
-            return
-        elif self.new_found_movies_counter > 0:
-            try:
-                self.radarec_logger.info(f"Searching for new movies")
-                self.new_found_movies_counter = 0
-                self.search_in_progress_flag = True
-                random_movies = random.sample(self.movies_to_use_in_search, min(8, len(self.movies_to_use_in_search)))
+    def build_recommendation(self, movie, base_movie):
+        from iso639 import Lang
+
+        genres = ", ".join(self.map_genre_ids_to_names(movie.get("genre_ids", [])))
+        overview = movie.get("overview", "")
+        popularity = movie.get("popularity", "")
+        original_language_code = movie.get("original_language", "en")
+        original_language = Lang(original_language_code)
+        vote_count = movie.get("vote_count", 0)
+        vote_avg = movie.get("vote_average", 0)
+        img_link = movie.get("poster_path", "")
+        date_string = movie.get("release_date", "0000-01-01")
+        year = date_string.split("-")[0]
+        if img_link:
+            img_url = f"poster/{movie.get('id', '')}"
+        else:
+            img_url = "https://via.placeholder.com/300x200"
+
+        return {
+            "Name": movie["title"],
+            "Year": year if year else "0000",
+            "Genre": genres,
+            "Status": "",
+            "Img_Link": img_url,
+            "Poster_Path": img_link,
+            "Votes": vote_count,
+            "Rating": vote_avg,
+            "Overview": overview,
+            "Language": original_language.name,
+            "Popularity": popularity,
+            "Base_Movie": base_movie,
+            "Score": 0,
+            "TMDB_ID": movie.get("id", ""),
+        }
 
-                for movie_name in random_movies:
-                    if self.stop_event.is_set():
-                        break
-                    movie_id = self.request_movie_id(movie_name)
-                    if not movie_id:
-                        continue
-                    related_movies = self.request_similar_movies(movie_id)
-                    for movie in related_movies:
-                        if self.stop_event.is_set():
-                            break
-                        cleaned_movie = unidecode(movie["title"]).lower()
-                        if cleaned_movie in self.cleaned_radarr_items:
-                            continue
-                        if any(movie["title"] == item["Name"] for item in self.recommended_movies):
-                            continue
-                        genres = ", ".join(self.map_genre_ids_to_names(movie.get("genre_ids", [])))
-                        overview = movie.get("overview", "")
-                        popularity = movie.get("popularity", "")
-                        original_language_code = movie.get("original_language", "en")
-                        original_language = Lang(original_language_code)
-                        vote_count = movie.get("vote_count", 0)
-                        vote_avg = movie.get("vote_average", 0)
-                        img_link = movie.get("poster_path", "")
-                        date_string = movie.get("release_date", "0000-01-01")
-                        year = date_string.split("-")[0]
-                        tmdb_id = movie.get("id", "")
-                        if img_link:
-                            img_url = f"https://image.tmdb.org/t/p/original/{img_link}"
-                        else:
-                            img_url = "https://via.placeholder.com/300x200"
-
-                        exclusive_movie = {
-                            "Name": movie["title"],
-                            "Year": year if year else "0000",
-                            "Genre": genres,
-                            "Status": "",
-                            "Img_Link": img_url,
-                            "Votes": f"Votes: {vote_count}",
-                            "Rating": f"Rating: {vote_avg}",
-                            "Overview": overview,
-                            "Language": original_language.name,
-                            "Popularity": popularity,
-                            "Base_Movie": movie_name,
-                            "TMDB_ID": tmdb_id,
-                        }
-                        self.recommended_movies.append(exclusive_movie)
-                        socketio.emit("more_movies_loaded", [exclusive_movie])
-                        self.new_found_movies_counter += 1
-
-                if self.new_found_movies_counter == 0:
-                    self.radarec_logger.info("Search Exhausted - Try selecting more movies from existing Radarr library")
-                    socketio.emit("new_toast_msg", {"title": "Search Exhausted", "message": "Try selecting more movies from existing Radarr library"})
+    def to_card(self, movie):
+        return {
+            "Name": movie["Name"],
+            "Year": movie["Year"],
+            "Genre": movie["Genre"],
+            "Status": movie["Status"],
+            "Img_Link": movie["Img_Link"],
+            "Votes": movie["Votes"],
+            "Rating": movie["Rating"],
+            "Score": movie.get("Score", 0),
+            "TMDB_ID": movie["TMDB_ID"],
+        }
 
-            except Exception as e:
-                self.radarec_logger.error(f"TheMovieDB Error: {str(e)}")
+    def queue_movies(self, movies, sid):
+        session = self.get_session(sid)
+        with self.add_queue_lock:
+            while len(self.add_workers) < self.add_concurrency:
+                worker = threading.Thread(target=self.add_movies_worker, name=f"Add_Movies_Worker_{len(self.add_workers)}")
+                worker.daemon = True
+                worker.start()
+                self.add_workers.append(worker)
+
+        rejected_count = 0
+        for raw_movie_name, movie_year in movies:
+            movie_name = urllib.parse.unquote(raw_movie_name)
+            recommendation = session.recommendation_index.get((movie_name, movie_year))
+            tmdb_id = recommendation["TMDB_ID"] if recommendation else None
+            with self.add_queue_lock:
+                if (movie_name, movie_year) in self.queued_movies:
+                    continue
+                try:
+                    self.add_queue.put_nowait((movie_name, movie_year, tmdb_id, sid))
+                except queue.Full:
+                    queued = False
+                else:
+                    queued = True
+                    self.queued_movies.add((movie_name, movie_year))
+            if not queued:
+                rejected_count += 1
+            if tmdb_id:
+                self.update_movie_status(tmdb_id, "Queued" if queued else "")
 
-            finally:
-                self.search_in_progress_flag = False
+        if rejected_count:
+            self.radarec_logger.warning(f"Add queue full, rejected {rejected_count} movies")
+            session.emit("new_toast_msg", {"title": "Add Queue Full", "message": f"{rejected_count} movies were not queued, please try again shortly."})
 
-        elif self.new_found_movies_counter == 0:
+    def add_movies_worker(self):
+        while True:
+            movie_name, movie_year, tmdb_id, sid = self.add_queue.get()
             try:
-                self.search_in_progress_flag = True
-                self.radarec_logger.info("Search Exhausted - Try selecting more movies from existing Radarr library")
-                socketio.emit("new_toast_msg", {"title": "Search Exhausted", "message": "Try selecting more movies from existing Radarr library"})
-                time.sleep(2)
-
-            except Exception as e:
-                self.radarec_logger.error(f"Search Exhausted Error: {str(e)}")
-
+                self.add_movies(movie_name, movie_year, tmdb_id, sid)
             finally:
-                self.search_in_progress_flag = False
-
-    def add_movies(self, data):
+                with self.add_queue_lock:
+                    self.queued_movies.discard((movie_name, movie_year))
+                self.add_queue.task_done()
+
+    def update_movie_status(self, tmdb_id, status):
+        with self.sessions_lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            recommendation = session.recommendations_by_tmdb_id.get(tmdb_id)
+            if recommendation:
+                recommendation["Status"] = status
+                session.emit("refresh_movie", self.to_card(recommendation))
+
+    def add_movies(self, movie_name, movie_year, tmdb_id, sid):
         try:
-            raw_movie_name, movie_year = data
-            movie_name = urllib.parse.unquote(raw_movie_name)
             movie_folder = movie_name.replace("/", " ")
-            tmdb_id = None
-            for movie in self.recommended_movies:
-                if movie["Name"] == movie_name and movie["Year"] == movie_year:
-                    tmdb_id = movie["TMDB_ID"]
-                    break
+            if tmdb_id:
+                self.update_movie_status(tmdb_id, "Adding")
             else:
                 tmdb_id = self.request_movie_id(movie_name, movie_year)
 
@@ -360,13 +1886,14 @@ class DataHandler:
                     response = requests.Response()
                     response.status_code = 201
                 else:
-                    response = requests.post(radarr_url, headers=headers, json=payload)
+                    response = self.radarr_client.post(radarr_url, call="radarr_add", headers=headers, json=payload, timeout=self.radarr_api_timeout)
 
                 if response.status_code == 201:
                     self.radarec_logger.info(f"Movie: '{movie_name}' added successfully to Radarr.")
                     status = "Added"
-                    self.radarr_items.append({"name": movie_name, "checked": False})
-                    self.cleaned_radarr_items.append(unidecode(movie_name).lower())
+                    radarr_id = response.json().get("id", 0) if response.content else 0
+                    year = int(movie_year) if str(movie_year).isdigit() else 0
+                    self.library_additions.add([RadarrMovie(name=clean_title(movie_name), year=year, tmdb_id=tmdb_id, radarr_id=radarr_id)])
                 else:
                     self.radarec_logger.error(f"Failed to add movie '{movie_name}' to Radarr.")
                     error_data = json.loads(response.content)
@@ -390,26 +1917,37 @@ class DataHandler:
             else:
                 status = "Failed to Add"
                 self.radarec_logger.info(f"No Matching Movie for: '{movie_name}' in The Movie Database.")
-                socketio.emit("new_toast_msg", {"title": "Failed to add Movie", "message": f"No Matching Movie for: '{movie_name}' in The Movie Database."})
+                if sid is not None:
+                    socketio.emit("new_toast_msg", {"title": "Failed to add Movie", "message": f"No Matching Movie for: '{movie_name}' in The Movie Database."}, to=sid)
 
-            for item in self.recommended_movies:
-                if item["Name"] == movie_name:
-                    item["Status"] = status
-                    socketio.emit("refresh_movie", item)
-                    break
+            if tmdb_id:
+                self.recommendation_store.set_outcome(tmdb_id, self.outcome_for_status(status))
+                self.update_movie_status(tmdb_id, status)
 
         except Exception as e:
             self.radarec_logger.error(f"Adding Movie Error: {str(e)}")
+            if tmdb_id:
+                self.update_movie_status(tmdb_id, "Failed to Add")
 
-    def load_settings(self):
+    def outcome_for_status(self, status):
+        if status == "Added":
+            return "added"
+        elif status == "Already in Radarr":
+            return "in_radarr"
+        else:
+            return "failed"
+
+    def load_settings(self, sid):
         try:
+            if self.worker_count > 1:
+                self.sync_settings()
             data = {
                 "radarr_address": self.radarr_address,
                 "radarr_api_key": self.radarr_api_key,
                 "root_folder_path": self.root_folder_path,
                 "tmdb_api_key": self.tmdb_api_key,
             }
-            socketio.emit("settings_loaded", data)
+            socketio.emit("settings_loaded", data, to=sid)
         except Exception as e:
             self.radarec_logger.error(f"Failed to load settings: {str(e)}")
 
@@ -419,83 +1957,172 @@ class DataHandler:
             self.radarr_api_key = data["radarr_api_key"]
             self.root_folder_path = data["root_folder_path"]
             self.tmdb_api_key = data["tmdb_api_key"]
+            if self.worker_count > 1:
+                # Other workers pick the change up on their next sync.
+                settings = {key: getattr(self, key) for key in ("radarr_address", "radarr_api_key", "root_folder_path", "tmdb_api_key")}
+                self.settings_version = self.shared_state.write_settings(settings)
         except Exception as e:
             self.radarec_logger.error(f"Failed to update settings: {str(e)}")
 
     def save_config_to_file(self):
         try:
-            with open(self.settings_config_file, "w") as json_file:
-                json.dump(
-                    {
-                        "radarr_address": self.radarr_address,
-                        "radarr_api_key": self.radarr_api_key,
-                        "root_folder_path": self.root_folder_path,
-                        "tmdb_api_key": self.tmdb_api_key,
-                        "fallback_to_top_result": self.fallback_to_top_result,
-                        "radarr_api_timeout": float(self.radarr_api_timeout),
-                        "quality_profile_id": self.quality_profile_id,
-                        "metadata_profile_id": self.metadata_profile_id,
-                        "search_for_movie": self.search_for_movie,
-                        "dry_run_adding_to_radarr": self.dry_run_adding_to_radarr,
-                        "minimum_rating": self.minimum_rating,
-                        "minimum_votes": self.minimum_votes,
-                        "language_choice": self.language_choice,
-                        "auto_start": self.auto_start,
-                        "auto_start_delay": self.auto_start_delay,
-                    },
-                    json_file,
-                    indent=4,
-                )
+            config_text = json.dumps(
+                {
+                    "radarr_address": self.radarr_address,
+                    "radarr_api_key": self.radarr_api_key,
+                    "root_folder_path": self.root_folder_path,
+                    "tmdb_api_key": self.tmdb_api_key,
+                    "tmdb_api_url": self.tmdb_api_url,
+                    "tmdb_image_url": self.tmdb_image_url,
+                    "fallback_to_top_result": self.fallback_to_top_result,
+                    "radarr_api_timeout": float(self.radarr_api_timeout),
+                    "search_concurrency": self.search_concurrency,
+                    "tmdb_api_timeout": self.tmdb_api_timeout,
+                    "tmdb_rate_limit": self.tmdb_rate_limit,
+                    "http_pool_size": self.http_pool_size,
+                    "http_max_retries": self.http_max_retries,
+                    "quality_profile_id": self.quality_profile_id,
+                    "metadata_profile_id": self.metadata_profile_id,
+                    "search_for_movie": self.search_for_movie,
+                    "dry_run_adding_to_radarr": self.dry_run_adding_to_radarr,
+                    "add_concurrency": self.add_concurrency,
+                    "add_queue_size": self.add_queue_size,
+                    "minimum_rating": self.minimum_rating,
+                    "minimum_votes": self.minimum_votes,
+                    "language_choice": self.language_choice,
+                    "include_similar_movies": self.include_similar_movies,
+                    "prefetch_buffer_size": self.prefetch_buffer_size,
+                    "prefetch_batch_size": self.prefetch_batch_size,
+                    "auto_start": self.auto_start,
+                    "auto_start_delay": self.auto_start_delay,
+                    "discovery_interval": self.discovery_interval,
+                    "discovery_request_budget": self.discovery_request_budget,
+                    "library_refresh_interval": self.library_refresh_interval,
+                    "tmdb_cache_size": self.tmdb_cache_size,
+                    "tmdb_cache_max_disk_entries": self.tmdb_cache_max_disk_entries,
+                    "tmdb_search_cache_ttl": self.tmdb_search_cache_ttl,
+                    "tmdb_recommendations_cache_ttl": self.tmdb_recommendations_cache_ttl,
+                    "poster_size": self.poster_size,
+                    "poster_cache_size": self.poster_cache_size,
+                    "prefetch_posters": self.prefetch_posters,
+                    "enable_profiler": self.enable_profiler,
+                },
+                indent=4,
+            )
+            # Only touch the file when a setting actually changed, so restarts do not rewrite it.
+            if os.path.exists(self.settings_config_file):
+                with open(self.settings_config_file, "r") as json_file:
+                    if json_file.read() == config_text:
+                        return
+            # Write a temporary file and swap it in, so a crash or a concurrent reader never sees a half-written config.
+            temp_path = f"{self.settings_config_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w") as json_file:
+                json_file.write(config_text)
+            os.replace(temp_path, self.settings_config_file)
 
         except Exception as e:
             self.radarec_logger.error(f"Error Saving Config: {str(e)}")
 
 
+metrics = Metrics()
+metrics.describe("radarec_upstream_request_seconds", "histogram", "Duration of upstream API calls including retries and, for the streamed Radarr movie list, reading the body.")
+metrics.describe("radarec_upstream_requests_total", "counter", "Upstream API calls by final HTTP status.")
+metrics.describe("radarec_upstream_retries_total", "counter", "Upstream API attempts that were retried.")
+metrics.describe("radarec_candidates_filtered_total", "counter", "Recommendation candidates dropped, by reason.")
+metrics.describe("radarec_candidates_found_total", "counter", "New recommendation candidates found.")
+metrics.describe("radarec_cards_delivered_total", "counter", "Recommendation cards sent to clients.")
+metrics.describe("radarec_searches_started_total", "counter", "Searches started.")
+metrics.describe("radarec_search_exhausted_total", "counter", "Searches that ran out of recommendations.")
+metrics.describe("radarec_scheduled_discovery_runs_total", "counter", "Scheduled discovery runs completed.")
+profiler = SamplingProfiler()
+
 app = Flask(__name__)
 app.secret_key = "secret_key"
-socketio = SocketIO(app)
+socketio = SocketIO(app, message_queue=os.environ.get("SOCKETIO_MESSAGE_QUEUE") or None)
 data_handler = DataHandler()
 
 
 @app.route("/")
 def home():
-    return render_template("base.html")
+    return render_template("base.html", websocket_only=data_handler.worker_count > 1)
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return data_handler.render_metrics(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+@app.route("/profiler/start", methods=["POST"])
+def start_profiler():
+    if not data_handler.enable_profiler:
+        abort(404)
+    try:
+        interval = float(request.args.get("interval", 0.01))
+    except ValueError:
+        interval = 0.0
+    if not interval > 0 or math.isinf(interval):
+        return "interval must be a positive number of seconds\n", 400
+    if not profiler.start(interval):
+        return "Profiler already running\n", 409
+    return "Profiler started\n"
+
+
+@app.route("/profiler/stop", methods=["POST"])
+def stop_profiler():
+    if not data_handler.enable_profiler:
+        abort(404)
+    stacks = profiler.stop()
+    if stacks is None:
+        return "Profiler not running\n", 409
+    return stacks, 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+
+@app.route("/poster/<int:tmdb_id>")
+def poster(tmdb_id):
+    poster_file = data_handler.get_poster(tmdb_id)
+    if not poster_file:
+        abort(404)
+    try:
+        return send_file(poster_file, mimetype="image/jpeg", max_age=7 * 24 * 3600)
+    except FileNotFoundError:
+        abort(404)
 
 
 @socketio.on("side_bar_opened")
-def side_bar_opened():
-    if data_handler.radarr_items:
-        ret = {"Status": "Success", "Data": data_handler.radarr_items, "Running": not data_handler.stop_event.is_set()}
-        socketio.emit("radarr_sidebar_update", ret)
+def side_bar_opened(client_version=None):
+    data_handler.send_sidebar_update(data_handler.get_session(request.sid), client_version)
 
 
 @socketio.on("get_radarr_movies")
 def get_radarr_movies():
-    thread = threading.Thread(target=data_handler.request_movies_from_radarr, name="Radarr_Thread")
+    thread = threading.Thread(target=data_handler.request_movies_from_radarr, args=(request.sid,), name="Radarr_Thread")
     thread.daemon = True
     thread.start()
 
 
 @socketio.on("adder")
 def add_movies(data):
-    thread = threading.Thread(target=data_handler.add_movies, args=(data,), name="Add_Movies_Thread")
-    thread.daemon = True
-    thread.start()
+    data_handler.queue_movies([data], request.sid)
+
+
+@socketio.on("add_all_movies")
+def add_all_movies(data):
+    data_handler.queue_movies(data, request.sid)
 
 
 @socketio.on("connect")
 def connection():
-    data_handler.connection()
+    data_handler.connection(request.sid)
 
 
 @socketio.on("disconnect")
 def disconnection():
-    data_handler.disconnection()
+    data_handler.disconnection(request.sid)
 
 
 @socketio.on("load_settings")
 def load_settings():
-    data_handler.load_settings()
+    data_handler.load_settings(request.sid)
 
 
 @socketio.on("update_settings")
@@ -506,19 +2133,27 @@ def update_settings(data):
 
 @socketio.on("start_req")
 def starter(data):
-    data_handler.start(data)
+    data_handler.get_session(request.sid).start(data)
 
 
 @socketio.on("stop_req")
 def stopper():
-    data_handler.stop_event.set()
+    data_handler.get_session(request.sid).stop()
+
+
+@socketio.on("overview_req")
+def overview_req(tmdb_id):
+    data_handler.get_session(request.sid).load_overview(tmdb_id)
+
+
+@socketio.on("dismiss_movie")
+def dismiss_movie(tmdb_id):
+    data_handler.get_session(request.sid).dismiss_movie(tmdb_id)
 
 
 @socketio.on("load_more_movies")
 def load_more_movies():
-    thread = threading.Thread(target=data_handler.find_similar_movies, name="Find_Similar")
-    thread.daemon = True
-    thread.start()
+    data_handler.get_session(request.sid).load_more_movies()
 
 
 if __name__ == "__main__":
@@ -10,12 +10,13 @@ var config_modal = document.getElementById('config-modal');
 var radarr_sidebar = document.getElementById('radarr-sidebar');
 var save_message = document.getElementById("save-message");
 var save_changes_button = document.getElementById("save-changes-button");
+var add_all_button = document.getElementById("add-all-button");
 const radarr_address = document.getElementById("radarr-address");
 const radarr_api_key = document.getElementById("radarr-api-key");
 const root_folder_path = document.getElementById("root-folder-path");
 const tmdb_api_key = document.getElementById("tmdb-api-key");
-var radarr_items = [];
-var socket = io();
+var radarr_library_version = 0;
+var socket = document.body.dataset.websocketOnly ? io({ transports: ['websocket'] }) : io();
 
 function check_if_all_selected() {
     var checkboxes = document.querySelectorAll('input[name="radarr-item"]');
@@ -56,9 +57,14 @@ function load_radarr_data(response) {
 function append_movies(movies) {
     var movie_row = document.getElementById('movie-row');
     var template = document.getElementById('movie-template');
+    var fragment = document.createDocumentFragment();
     movies.forEach(function (movie) {
         var clone = document.importNode(template.content, true);
         var movie_col = clone.querySelector('#movie-column');
+        movie_col.dataset.tmdbId = movie.TMDB_ID;
+        movie_col.dataset.score = movie.Score;
+        movie_col.dataset.name = movie.Name;
+        movie_col.dataset.year = movie.Year;
 
         movie_col.querySelector('.card-title').textContent = `${movie.Name} (${movie.Year})`;
         movie_col.querySelector('.genre').textContent = movie.Genre;
@@ -77,27 +83,86 @@ function append_movies(movies) {
         movie_col.querySelector('.get-overview-btn').addEventListener('click', function () {
             overview_req(movie);
         });
-        movie_col.querySelector('.votes').textContent = movie.Votes;
-        movie_col.querySelector('.rating').textContent = movie.Rating;
-
-        var add_button = movie_col.querySelector('.add-to-radarr-btn');
-        if (movie.Status === "Added" || movie.Status === "Already in Radarr") {
-            movie_col.querySelector('.card-body').classList.add('status-green');
-            add_button.classList.remove('btn-primary');
-            add_button.classList.add('btn-secondary');
-            add_button.disabled = true;
-            add_button.textContent = movie.Status;
-        } else if (movie.Status === "Failed to Add" || movie.Status === "Invalid Path" || movie.Status === "Invalid Movie ID") {
-            movie_col.querySelector('.card-body').classList.add('status-red');
-            add_button.classList.remove('btn-primary');
-            add_button.classList.add('btn-danger');
+        movie_col.querySelector('.dismiss-btn').addEventListener('click', function () {
+            socket.emit('dismiss_movie', movie.TMDB_ID);
+            movie_col.remove();
+        });
+        movie_col.querySelector('.votes').textContent = `Votes: ${movie.Votes}`;
+        movie_col.querySelector('.rating').textContent = `Rating: ${movie.Rating}`;
+
+        apply_movie_status(movie_col.querySelector('.card-body'), movie.Status);
+        fragment.appendChild(clone);
+    });
+    movie_row.appendChild(fragment);
+}
+
+function apply_movie_status(card_body, status) {
+    var add_button = card_body.querySelector('.add-to-radarr-btn');
+    card_body.classList.remove('status-green', 'status-red', 'status-blue');
+    add_button.classList.remove('btn-primary', 'btn-secondary', 'btn-danger');
+    if (status === "Added" || status === "Already in Radarr") {
+        card_body.classList.add('status-green');
+        add_button.classList.add('btn-secondary');
+        add_button.disabled = true;
+        add_button.textContent = status;
+    } else if (status === "Failed to Add" || status === "Invalid Path" || status === "Invalid Movie ID") {
+        card_body.classList.add('status-red');
+        add_button.classList.add('btn-danger');
+        add_button.disabled = true;
+        add_button.textContent = status;
+    } else if (status === "Queued" || status === "Adding") {
+        card_body.classList.add('status-blue');
+        add_button.classList.add('btn-primary');
+        add_button.disabled = true;
+        add_button.textContent = `${status}...`;
+    } else {
+        card_body.classList.add('status-blue');
+        add_button.classList.add('btn-primary');
+        add_button.disabled = false;
+        add_button.textContent = "Add to Radarr";
+    }
+}
+
+function add_all_visible_movies() {
+    var movies = [];
+    document.querySelectorAll('#movie-column').forEach(function (card) {
+        var add_button = card.querySelector('.add-to-radarr-btn');
+        if (!add_button.disabled) {
             add_button.disabled = true;
-            add_button.textContent = movie.Status;
-        } else {
-            movie_col.querySelector('.card-body').classList.add('status-blue');
+            add_button.textContent = "Queued...";
+            movies.push([encodeURIComponent(card.dataset.name), card.dataset.year]);
         }
-        movie_row.appendChild(clone);
     });
+    if (movies.length === 0) {
+        show_toast("Nothing to Add", "All visible movies have already been added.");
+    } else if (socket.connected) {
+        socket.emit('add_all_movies', movies);
+    } else {
+        show_toast("Connection Lost", "Please reload to continue.");
+    }
+}
+
+function reorder_movies(scores) {
+    var movie_row = document.getElementById('movie-row');
+    var cards_by_id = {};
+    movie_row.querySelectorAll('#movie-column').forEach(function (card) {
+        cards_by_id[card.dataset.tmdbId] = card;
+    });
+    scores.forEach(function (item) {
+        var card = cards_by_id[item.TMDB_ID];
+        if (card) {
+            card.dataset.score = item.Score;
+        }
+    });
+    var cards = Object.values(cards_by_id);
+    cards.sort(function (a, b) {
+        return parseFloat(b.dataset.score) - parseFloat(a.dataset.score);
+    });
+    var fragment = document.createDocumentFragment();
+    cards.forEach(function (card) {
+        fragment.appendChild(card);
+    });
+    movie_row.appendChild(fragment);
 }
 
 function add_to_radarr(movie_name, movie_year) {
@@ -142,7 +207,6 @@ radarr_get_movies_button.addEventListener('click', function () {
     radarr_get_movies_button.disabled = true;
     radarr_spinner.classList.remove('d-none');
     radarr_status.textContent = "Accessing Radarr API";
-    radarr_item_list.innerHTML = '';
     socket.emit("get_radarr_movies");
 });
 
@@ -177,6 +241,10 @@ start_stop_button.addEventListener('click', function () {
     }
 });
 
+add_all_button.addEventListener('click', function () {
+    add_all_visible_movies();
+});
+
 save_changes_button.addEventListener("click", () => {
     socket.emit("update_settings", {
         "radarr_address": radarr_address.value,
@@ -204,117 +272,175 @@ config_modal.addEventListener('show.bs.modal', function (event) {
 });
 
 radarr_sidebar.addEventListener('show.bs.offcanvas', function (event) {
-    socket.emit("side_bar_opened");
+    socket.emit("side_bar_opened", radarr_library_version);
 });
 
-window.addEventListener('scroll', function () {
-    if (window.innerHeight + window.scrollY >= document.body.offsetHeight) {
-        socket.emit('load_more_movies');
-    }
-});
+let load_more_pending = false;
+let load_more_timeout = null;
+let scroll_check_scheduled = false;
 
-window.addEventListener('touchmove', function () {
-    if (window.innerHeight + window.scrollY >= document.body.offsetHeight) {
-        socket.emit('load_more_movies');
+function request_more_movies() {
+    if (load_more_pending || !socket.connected) {
+        return;
     }
-});
+    load_more_pending = true;
+    socket.emit('load_more_movies');
+    load_more_timeout = setTimeout(release_load_more, 5000);
+}
 
-window.addEventListener('touchend', () => {
-    const { scrollHeight, scrollTop, clientHeight } = document.documentElement;
-    if (Math.abs(scrollHeight - clientHeight - scrollTop) < 1) {
-        socket.emit('load_more_movies');
-    }
-});
+function release_load_more() {
+    load_more_pending = false;
+    clearTimeout(load_more_timeout);
+}
 
-socket.on("radarr_sidebar_update", (response) => {
-    if (response.Status == "Success") {
-        radarr_status.textContent = "Radarr List Retrieved";
-        radarr_items = response.Data;
-        radarr_item_list.innerHTML = '';
-        radarr_select_all_container.classList.remove('d-none');
+function check_scroll_position() {
+    if (scroll_check_scheduled) {
+        return;
+    }
+    scroll_check_scheduled = true;
+    window.requestAnimationFrame(function () {
+        scroll_check_scheduled = false;
+        const { scrollHeight, scrollTop, clientHeight } = document.documentElement;
+        if (scrollHeight - clientHeight - scrollTop < 1) {
+            request_more_movies();
+        }
+    });
+}
 
-        for (var i = 0; i < radarr_items.length; i++) {
-            var item = radarr_items[i];
+window.addEventListener('scroll', check_scroll_position, { passive: true });
+window.addEventListener('touchmove', check_scroll_position, { passive: true });
+window.addEventListener('touchend', check_scroll_position, { passive: true });
+
+function create_radarr_item(item) {
+    var div = document.createElement("div");
+    div.className = "form-check";
+    div.id = "radarr-item-" + item.tmdb_id;
+    div.dataset.sortKey = item.name.toLowerCase();
+
+    var input = document.createElement("input");
+    input.type = "checkbox";
+    input.className = "form-check-input";
+    input.id = "radarr-" + item.tmdb_id;
+    input.name = "radarr-item";
+    input.value = item.tmdb_id;
+
+    if (item.checked) {
+        input.checked = true;
+    }
 
-            var div = document.createElement("div");
-            div.className = "form-check";
+    var label = document.createElement("label");
+    label.className = "form-check-label";
+    label.htmlFor = "radarr-" + item.tmdb_id;
+    label.textContent = item.name;
 
-            var input = document.createElement("input");
-            input.type = "checkbox";
-            input.className = "form-check-input";
-            input.id = "radarr-" + i;
-            input.name = "radarr-item";
-            input.value = item.name;
+    input.addEventListener("change", function () {
+        check_if_all_selected();
+    });
 
-            if (item.checked) {
-                input.checked = true;
-            }
+    div.appendChild(input);
+    div.appendChild(label);
+    return div;
+}
 
-            var label = document.createElement("label");
-            label.className = "form-check-label";
-            label.htmlFor = "radarr-" + i;
-            label.textContent = item.name;
+function insert_radarr_item(element) {
+    var children = radarr_item_list.children;
+    var sort_key = element.dataset.sortKey;
+    var low = 0;
+    var high = children.length;
+    while (low < high) {
+        var mid = (low + high) >> 1;
+        if (children[mid].dataset.sortKey <= sort_key) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    radarr_item_list.insertBefore(element, children[low] || null);
+}
 
-            input.addEventListener("change", function () {
-                check_if_all_selected();
-            });
+function finish_radarr_update(response) {
+    radarr_get_movies_button.disabled = false;
+    radarr_spinner.classList.add('d-none');
+    load_radarr_data(response);
+}
 
-            div.appendChild(input);
-            div.appendChild(label);
+socket.on("radarr_sidebar_update", (response) => {
+    if (response.Status == "Success") {
+        radarr_status.textContent = "Radarr List Retrieved";
+        radarr_library_version = response.Version;
+        radarr_item_list.innerHTML = '';
+        radarr_select_all_container.classList.remove('d-none');
 
-            radarr_item_list.appendChild(div);
-        }
+        var fragment = document.createDocumentFragment();
+        response.Data.forEach(function (item) {
+            fragment.appendChild(create_radarr_item(item));
+        });
+        radarr_item_list.appendChild(fragment);
     }
     else {
         radarr_status.textContent = response.Code;
     }
-    radarr_get_movies_button.disabled = false;
-    radarr_spinner.classList.add('d-none');
-    load_radarr_data(response);
+    finish_radarr_update(response);
 });
 
-socket.on("refresh_movie", (movie) => {
-    var movie_cards = document.querySelectorAll('#movie-column');
-    movie_cards.forEach(function (card) {
-        var card_body = card.querySelector('.card-body');
-        var card_movie_name = card_body.querySelector('.card-title').textContent.trim();
-        card_movie_name = card_movie_name.replace(/\s*\(\d{4}\)$/, "");
-        if (card_movie_name === movie.Name) {
-            card_body.classList.remove('status-green', 'status-red', 'status-blue');
-
-            var add_button = card_body.querySelector('.add-to-radarr-btn');
-
-            if (movie.Status === "Added" || movie.Status === "Already in Radarr") {
-                card_body.classList.add('status-green');
-                add_button.classList.remove('btn-primary');
-                add_button.classList.add('btn-secondary');
-                add_button.disabled = true;
-                add_button.textContent = movie.Status;
-            } else if (movie.Status === "Failed to Add" || movie.Status === "Invalid Path") {
-                card_body.classList.add('status-red');
-                add_button.classList.remove('btn-primary');
-                add_button.classList.add('btn-danger');
-                add_button.disabled = true;
-                add_button.textContent = movie.Status;
-            } else {
-                card_body.classList.add('status-blue');
-                add_button.disabled = false;
-            }
-            return;
+socket.on("radarr_library_delta", (response) => {
+    if (response.Base_Version !== radarr_library_version) {
+        socket.emit("side_bar_opened", radarr_library_version);
+        return;
+    }
+
+    response.Removed.forEach(function (tmdb_id) {
+        var element = document.getElementById("radarr-item-" + tmdb_id);
+        if (element) {
+            element.remove();
         }
     });
+    response.Changed.forEach(function (item) {
+        var element = document.getElementById("radarr-item-" + item.tmdb_id);
+        if (element) {
+            item.checked = element.querySelector('input').checked;
+            element.remove();
+        }
+        insert_radarr_item(create_radarr_item(item));
+    });
+    response.Added.forEach(function (item) {
+        insert_radarr_item(create_radarr_item(item));
+    });
+
+    radarr_library_version = response.Version;
+    radarr_status.textContent = "Radarr List Retrieved";
+    radarr_select_all_container.classList.remove('d-none');
+    finish_radarr_update(response);
+});
+
+socket.on("refresh_movie", (movie) => {
+    var card = document.querySelector(`#movie-column[data-tmdb-id="${movie.TMDB_ID}"]`);
+    if (card) {
+        apply_movie_status(card.querySelector('.card-body'), movie.Status);
+    }
 });
 
 socket.on('more_movies_loaded', function (data) {
     append_movies(data);
+    release_load_more();
+});
+
+socket.on("movie_scores_updated", function (scores) {
+    reorder_movies(scores);
+});
+
+socket.on("overview_loaded", function (movie) {
+    movie_overview_modal(movie);
 });
 
 socket.on('clear', function () {
     clear_all();
+    release_load_more();
 });
 
 socket.on("new_toast_msg", function (data) {
     show_toast(data.title, data.message);
+    release_load_more();
 });
 
 socket.on("disconnect", function () {
@@ -334,7 +460,7 @@ let overview_request_flag = false;
 function overview_req(movie) {
     if (!overview_request_flag) {
         overview_request_flag = true;
-        movie_overview_modal(movie);
+        socket.emit("overview_req", movie.TMDB_ID);
         setTimeout(() => {
             overview_request_flag = false;
         }, 1500);
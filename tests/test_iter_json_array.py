@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+
+import pytest
+
+SRC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+@pytest.fixture(scope="module")
+def iter_json_array(tmp_path_factory):
+    # Importing RadaRec builds the DataHandler, which creates its config folder in the working directory.
+    working_directory = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("radarec"))
+    sys.path.insert(0, SRC_FOLDER)
+    try:
+        import RadaRec
+    finally:
+        os.chdir(working_directory)
+    return RadaRec.iter_json_array
+
+
+def split_into_chunks(data, size):
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+def test_items_split_across_chunks(iter_json_array):
+    movies = [{"title": f"Movie {index}", "year": 2000 + index, "tmdbId": index, "ratings": [7.5, 100]} for index in range(50)]
+    data = json.dumps(movies).encode()
+    for size in (1, 2, 7, 64, len(data)):
+        assert list(iter_json_array(split_into_chunks(data, size))) == movies
+
+
+def test_numbers_and_literals_split_across_chunks(iter_json_array):
+    assert list(iter_json_array([b"[12", b"34, tr", b"ue, nu", b"ll]"])) == [1234, True, None]
+
+
+def test_multibyte_utf8_split_across_chunks(iter_json_array):
+    movies = [{"title": "Amélie"}, {"title": "千と千尋の神隠し"}, {"title": "Léon 🎬"}]
+    data = json.dumps(movies, ensure_ascii=False).encode()
+    assert list(iter_json_array(split_into_chunks(data, 1))) == movies
+
+
+def test_empty_array_and_whitespace(iter_json_array):
+    assert list(iter_json_array([b" \r\n[ ", b" ]\n"])) == []
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [b'[{"a":1},{"b":2},{"c"'],
+        [b'[{"a":1},', b"garbage"],
+        [b'[{"a":1},{"b":2}'],
+        [b'[{"a":1},'],
+        [b"[1,]"],
+        [b"[12"],
+        [b"["],
+        [b'["caf\xc3'],
+    ],
+)
+def test_truncated_or_malformed_array_raises(iter_json_array, chunks):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunks))
+
+
+@pytest.mark.parametrize("chunks", [[b'[{"a":1}] garbage'], [b"[1 2]"], [b'{"a":1}'], [b""]])
+def test_invalid_structure_raises(iter_json_array, chunks):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunks))